@@ -26,7 +26,8 @@ class DatabaseConfig:
     async def connect(self):
         """Establish database connection"""
         try:
-            self.client = AsyncIOMotorClient(self.uri)
+            # tz_aware: read dates back as UTC-aware datetimes, like the ones the services write
+            self.client = AsyncIOMotorClient(self.uri, tz_aware=True)
             self.database = self.client[self.db_name]
 
             # Verify connection
@@ -77,7 +78,8 @@ class SecondaryDatabaseConfig:
     async def connect(self):
         """Establish secondary database connection"""
         try:
-            self.client = AsyncIOMotorClient(self.uri)
+            # tz_aware: read dates back as UTC-aware datetimes, like the ones the services write
+            self.client = AsyncIOMotorClient(self.uri, tz_aware=True)
             self.database = self.client[self.db_name]
 
             # Verify connection
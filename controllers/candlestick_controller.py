@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import Optional
 import logging
 from services.candlestick_service import CandlestickService
@@ -59,6 +60,18 @@ class CandlestickController:
             GET /api/candlesticks?symbol=BTC&timeframe=15m - Get specific candle
         """
         logger.info(f"GET candlesticks - symbol: {symbol}, timeframe: {timeframe}")
+
+        # Unfiltered hot path: stream candles straight from the cursor
+        if not symbol:
+            try:
+                # Opening the stream runs the query, so failures surface before the 200 is sent
+                stream = await self.service.stream_all_candlesticks(limit)
+            except Exception as e:
+                logger.error(f"Error opening candlestick stream: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+
+            return StreamingResponse(stream, media_type="application/json")
+
         return await self.service.get_all_candlesticks(symbol, timeframe, limit)
 
     async def update_all(self):
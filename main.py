@@ -20,6 +20,9 @@ from services.okx_websocket_service import okx_websocket_service
 from services.market_analysis_service import market_analysis_service
 from repositories.candle_repository import CandleRepository
 from repositories.token_repository import TokenRepository
+from repositories.failed_token_repository import FailedTokenRepository
+from repositories.secondary_notification_repository import SecondaryNotificationRepository
+from repositories.secondary_token_repository import SecondaryTokenRepository
 
 # Configure logging
 logging.basicConfig(
@@ -47,6 +50,10 @@ async def lifespan(app: FastAPI):
     try:
         await secondary_db_config.connect()
         logger.info("MongoDB SECONDARY: Connected successfully (Dev)")
+
+        # Ensure indexes for SECONDARY hot query patterns
+        await SecondaryNotificationRepository().ensure_indexes()
+        await SecondaryTokenRepository().ensure_indexes()
     except Exception as e:
         logger.warning(f"MongoDB SECONDARY: Connection failed - {e}")
         logger.warning("Application will continue with PRIMARY database only")
@@ -54,6 +61,12 @@ async def lifespan(app: FastAPI):
     # Inject dependencies into OKX WebSocket service
     candle_repo = CandleRepository()
     token_repo = TokenRepository()
+
+    # Ensure indexes for PRIMARY hot query patterns
+    await token_repo.ensure_indexes()
+    await candle_repo.ensure_indexes()
+    await FailedTokenRepository().ensure_indexes()
+
     okx_websocket_service.inject_dependencies(
         candle_repository=candle_repo,
         token_repository=token_repo,
@@ -90,6 +103,10 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down application...")
     await okx_websocket_service.stop()
     scheduler_service.stop()
+    await token_controller.service.cmc_service.close_client()
+    # Let background SECONDARY syncs finish before closing the connections
+    await candlestick_controller.service.failed_token_service.drain()
+    await failed_token_controller.service.drain()
     await db_config.disconnect()
     await secondary_db_config.disconnect()
     logger.info("Application shut down successfully")
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -29,4 +29,4 @@ class CandleResponse(BaseModel):
     message: str
     count: int
     data: List[CandleModel]
-    timestamp: Optional[datetime] = Field(default_factory=datetime.now)
+    timestamp: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -17,7 +17,7 @@ class FailedTokenModel(BaseModel):
     reason: str = Field(..., description="Failure reason from OKX API")
     timeframes_failed: List[str] = Field(default_factory=list, description="List of timeframes that failed")
     total_attempts: int = Field(default=0, description="Number of timeframes attempted")
-    timestamp: datetime = Field(default_factory=datetime.now, description="When the failure was recorded")
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="When the failure was recorded")
 
 class FailedTokenResponse(BaseModel):
     """Response model for failed token endpoints"""
@@ -27,7 +27,7 @@ class FailedTokenResponse(BaseModel):
     message: str
     count: int
     data: List[FailedTokenModel]
-    timestamp: Optional[datetime] = Field(default_factory=datetime.now)
+    timestamp: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class FailedTokenStats(BaseModel):
     """Statistics about failed tokens"""
@@ -38,4 +38,4 @@ class FailedTokenStats(BaseModel):
     failed_tokens: int = Field(..., description="Tokens not available in OKX")
     success_rate: float = Field(..., description="Success rate percentage")
     total_candlesticks: int = Field(..., description="Total candlesticks inserted")
-    last_update: datetime = Field(default_factory=datetime.now, description="Last update timestamp")
+    last_update: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="Last update timestamp")
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -39,7 +39,7 @@ class MarketAnalysisModel(BaseModel):
     directionNumber: float = Field(..., description="0 for SHORT, 0.5 for FLAT, 1 for LONG")
     directionNumberReal: float = Field(..., description="Real direction number with decimals")
     candlesByTimeframe: CandlesByTimeframe = Field(..., description="Analysis grouped by timeframes")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Analysis timestamp")
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="Analysis timestamp")
 
 # ===== OLD MODELS (keep for backward compatibility) =====
 
@@ -59,7 +59,7 @@ class MarketAnalysisModelOld(BaseModel):
     bullish_percentage: float = Field(..., description="Percentage of bullish tokens")
     bearish_percentage: float = Field(..., description="Percentage of bearish tokens")
     neutral_percentage: float = Field(..., description="Percentage of neutral tokens")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Analysis timestamp")
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="Analysis timestamp")
     top_performers: Optional[List[TopPerformer]] = Field(default=[], description="Top 10 performing tokens")
     worst_performers: Optional[List[TopPerformer]] = Field(default=[], description="Worst 10 performing tokens")
 
@@ -77,7 +77,7 @@ class MarketAnalysisResponseOld(BaseModel):
     status: str
     message: str
     data: Optional[MarketAnalysisModelOld] = None
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class MarketHistoryResponse(BaseModel):
     """Response model for market analysis history"""
@@ -87,4 +87,4 @@ class MarketHistoryResponse(BaseModel):
     message: str
     count: int
     data: List[MarketAnalysisModel]
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
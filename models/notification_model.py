@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 
 class NotificationModel(BaseModel):
     """
@@ -13,7 +13,7 @@ class NotificationModel(BaseModel):
     symbol: Optional[str] = Field(None, description="Token symbol (if applicable)")
     data: Optional[dict] = Field(default_factory=dict, description="Additional data")
     read: bool = Field(default=False, description="Whether notification has been read")
-    timestamp: datetime = Field(default_factory=datetime.now, description="When notification was created")
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="When notification was created")
 
     class Config:
         json_schema_extra = {
@@ -1,7 +1,7 @@
 # ==========================
 # Token Model
 # ==========================
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -21,7 +21,7 @@ class TokenModel(BaseModel):
     exchanges: List[str] = Field(default_factory=list, description="List of exchanges")
     is_on_okx: bool = Field(False, alias="isOnOKX", description="Token listed on OKX")
     exchange_count: int = Field(0, alias="exchangeCount", description="Number of exchanges")
-    last_updated: datetime = Field(default_factory=datetime.now, alias="lastUpdated")
+    last_updated: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), alias="lastUpdated")
 
 class TokenResponse(BaseModel):
     """Response model for token endpoints"""
@@ -32,5 +32,5 @@ class TokenResponse(BaseModel):
     source: str
     count: int
     data: List[TokenModel]
-    timestamp: Optional[datetime] = Field(default_factory=datetime.now)
+    timestamp: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
     api_error: Optional[str] = Field(None, alias="apiError", description="API error message if any")
\ No newline at end of file
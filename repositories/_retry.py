@@ -0,0 +1,112 @@
+import logging
+import random
+import asyncio
+from typing import Dict, Any, Callable, Awaitable, Optional, Tuple, Type
+from pymongo.errors import ConnectionFailure, AutoReconnect, NetworkTimeout, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Transient errors (network blips, failovers) that are worth retrying
+RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (ConnectionFailure, AutoReconnect, NetworkTimeout)
+
+# Server error codes for transient conditions (stepdowns, shutdowns, network timeouts)
+RETRYABLE_CODES = frozenset({
+    6,      # HostUnreachable
+    7,      # HostNotFound
+    89,     # NetworkTimeout
+    91,     # ShutdownInProgress
+    189,    # PrimarySteppedDown
+    262,    # ExceededTimeLimit
+    9001,   # SocketException
+    10107,  # NotWritablePrimary
+    11600,  # InterruptedAtShutdown
+    11602,  # InterruptedDueToReplStateChange
+    13435,  # NotPrimaryNoSecondaryOk
+    13436,  # NotPrimaryOrSecondary
+})
+
+def _is_retryable(error: BaseException, retryable: Tuple[Type[BaseException], ...]) -> bool:
+    """Whether an error is transient, i.e. another attempt could succeed"""
+    if isinstance(error, retryable):
+        return True
+    if isinstance(error, OperationFailure):
+        return error.code in RETRYABLE_CODES or error.has_error_label("RetryableWriteError")
+    # wait_for timing out an attempt (only happens when retry_budget is set)
+    return isinstance(error, asyncio.TimeoutError)
+
+class RetryableRepository:
+    """
+    Base class for SECONDARY database repositories
+    Provides a shared retry helper with exponential backoff and jitter
+    """
+
+    max_retries = 3
+    base_delay = 0.1  # seconds, doubled on each retry
+    max_delay = 2  # seconds
+    retry_budget: Optional[float] = None  # seconds across all attempts, None for no deadline
+
+    async def _with_retry(
+        self,
+        coro_factory: Callable[[], Awaitable[Dict[str, Any]]],
+        *,
+        op_name: str,
+        retryable: Tuple[Type[BaseException], ...] = RETRYABLE_ERRORS
+    ) -> Dict[str, Any]:
+        """
+        Run an operation with retry logic
+
+        Transient failures are retried with exponential backoff plus random
+        jitter so concurrent callers don't retry in lockstep. Anything else
+        (duplicate keys, invalid documents or ids, non-transient server errors)
+        fails on the first attempt. Errors are logged and returned instead of
+        raised, to avoid blocking the main database operation.
+
+        Args:
+            coro_factory: Callable returning a fresh coroutine for each attempt
+            op_name: Operation name used in log messages
+            retryable: Exception types treated as transient
+
+        Returns:
+            Dictionary with operation result
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.retry_budget if self.retry_budget is not None else None
+
+        for attempt in range(self.max_retries):
+            try:
+                if deadline is None:
+                    result = await coro_factory()
+                else:
+                    result = await asyncio.wait_for(coro_factory(), timeout=deadline - loop.time())
+                if attempt > 0:
+                    logger.info(f"[SECONDARY DB] {op_name} succeeded after {attempt + 1} attempts")
+                return result
+            except Exception as e:
+                if not _is_retryable(e, retryable):
+                    logger.error(f"[SECONDARY DB] {op_name} failed with non-retryable error: {e}")
+                    return {
+                        'status': 'error',
+                        'message': str(e),
+                        'action': 'failed'
+                    }
+
+                delay = min(self.max_delay, self.base_delay * (2 ** attempt)) * (0.5 + random.random())
+                # Give up early when the remaining budget can't cover the backoff
+                out_of_time = deadline is not None and deadline - loop.time() <= delay
+
+                if attempt < self.max_retries - 1 and not out_of_time:
+                    logger.warning(
+                        f"[SECONDARY DB] {op_name} attempt {attempt + 1}/{self.max_retries} failed: {e}. "
+                        f"Retrying in {delay:.2f}s..."
+                    )
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error(
+                        f"[SECONDARY DB] All {attempt + 1} attempts failed. "
+                        f"{op_name} NOT applied to secondary database: {e}"
+                    )
+                    return {
+                        'status': 'error',
+                        'message': f'Failed after {attempt + 1} attempts: {str(e)}',
+                        'action': 'failed'
+                    }
@@ -1,10 +1,34 @@
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from pymongo import UpdateOne
 from config.database import db_config
+from models.candle_model import CandleModel
 
 logger = logging.getLogger(__name__)
 
+# Stored timestamps are timezone-aware UTC (BSON dates are UTC)
+_UTC = timezone.utc
+
+# Fields that change while a candle is still open
+SNAPSHOT_FIELDS = ('close', 'high', 'low', 'performance')
+
+# Display order of timeframes within a symbol
+TIMEFRAME_ORDER = ['15m', '30m', '1h', '4h', '12h', '1d']
+
+# Only the fields exposed by CandleModel
+CANDLE_MODEL_PROJECTION = {**{field: 1 for field in CandleModel.model_fields}, '_id': 0}
+
+# Documents per getMore round-trip: balances RTT against peak memory
+CURSOR_BATCH_SIZE = 200
+
+# A whole timeframe is read at once: fewer, larger getMore batches
+TIMEFRAME_BATCH_SIZE = 5000
+
+# Bulk upserts are split into unordered bulk_write chunks of this many ops
+BULK_CHUNK = 1000
+
 class CandleRepository:
     """
     Repository for Candle operations
@@ -14,18 +38,34 @@ class CandleRepository:
     def __init__(self):
         self.collection_name = 'trinityCandles'
 
-    @property
+    @cached_property
     def collection(self):
         """Get the MongoDB collection"""
         return db_config.get_collection(self.collection_name)
 
+    async def ensure_indexes(self) -> None:
+        """Create indexes for the hot query patterns (idempotent)"""
+        try:
+            collection = self.collection
+
+            # Market analysis: serves the timeframe $match (the $facet sorts on computed _perf in memory)
+            await collection.create_index([('timeframe', 1), ('performance', -1)], background=True)
+
+            # Candle upserts and the per-symbol $lookup of iter_all_ordered_by_performance
+            await collection.create_index([('symbol', 1), ('timeframe', 1)], background=True)
+
+            logger.info(f"Indexes ensured for {self.collection_name}")
+
+        except Exception as e:
+            logger.error(f"Error creating indexes for {self.collection_name}: {e}")
+
     async def upsert_candle(self, candle_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Insert or update a candle
         Uses unique combination of symbol + timeframe (always latest candle)
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             filter_query = {
                 'symbol': candle_data['symbol'],
@@ -35,10 +75,10 @@ class CandleRepository:
             update_data = {
                 '$set': {
                     **candle_data,
-                    'updatedAt': datetime.now()
+                    'updatedAt': datetime.now(_UTC)
                 },
                 '$setOnInsert': {
-                    'createdAt': datetime.now()
+                    'createdAt': datetime.now(_UTC)
                 }
             }
 
@@ -62,55 +102,104 @@ class CandleRepository:
         """Alias for upsert_candle for consistency with upsert_many"""
         return await self.upsert_candle(candle_data)
 
-    async def upsert_many(self, candles: List[Dict[str, Any]]) -> Dict[str, int]:
-        """
-        Insert or update multiple candles
-        """
-        try:
-            inserted = 0
-            modified = 0
-
-            for candle in candles:
-                result = await self.upsert_candle(candle)
-                if result['upserted']:
-                    inserted += 1
-                elif result['modified'] > 0:
-                    modified += 1
-
-            logger.info(f"Candles upsert: {inserted} inserted, {modified} modified")
-            return {'inserted': inserted, 'modified': modified}
-
-        except Exception as e:
-            logger.error(f"Error upserting multiple candles: {e}")
-            raise
-
     async def find_all(self, limit: int = 1000) -> List[Dict[str, Any]]:
         """Get all candles"""
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             cursor = collection.find().sort('timestamp', -1).limit(limit)
             return await cursor.to_list(length=limit)
         except Exception as e:
             logger.error(f"Error finding all candles: {e}")
             raise
 
-    async def find_by_timeframe(self, timeframe: str) -> List[Dict[str, Any]]:
-        """Get all candles for a specific timeframe"""
+    async def find_by_timeframe(
+        self,
+        timeframe: str,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get all candles for a specific timeframe (pass projection to fetch only some fields)"""
         try:
-            collection = db_config.get_collection(self.collection_name)
-            cursor = collection.find({'timeframe': timeframe})
+            collection = self.collection
+            cursor = collection.find({'timeframe': timeframe}, projection).batch_size(TIMEFRAME_BATCH_SIZE)
             return await cursor.to_list(length=None)
         except Exception as e:
             logger.error(f"Error finding candles by timeframe {timeframe}: {e}")
             raise
 
+    async def iter_by_timeframe(
+        self,
+        timeframe: str,
+        projection: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the candles of a timeframe one cursor batch at a time
+        Same query as find_by_timeframe, without materializing the whole result
+        """
+        try:
+            collection = self.collection
+            cursor = collection.find({'timeframe': timeframe}, projection).batch_size(TIMEFRAME_BATCH_SIZE)
+            async for candle in cursor:
+                yield candle
+        except Exception as e:
+            logger.error(f"Error streaming candles by timeframe {timeframe}: {e}")
+            raise
+
+    async def get_performance_summary(self, timeframe: str, top_n: int = 10) -> Dict[str, Any]:
+        """
+        Summarize a timeframe server-side in a single aggregation
+        Missing performance counts as 0, as in a Python-side scan
+        The $match uses the (timeframe, performance) index; the sorts inside $facet
+        run in memory over the matched candles (top-k, bounded by $limit)
+
+        Returns:
+            Dict with bullish/bearish/total counts and the full best/worst candles,
+            both ordered by performance descending
+        """
+        try:
+            collection = self.collection
+            pipeline = [
+                {'$match': {'timeframe': timeframe}},
+                {'$addFields': {'_perf': {'$ifNull': ['$performance', 0]}}},
+                {'$facet': {
+                    # One bucket per sign of performance (-1, 0, 1): no per-document branching
+                    'counts': [
+                        {'$group': {'_id': {'$cmp': ['$_perf', 0]}, 'n': {'$sum': 1}}}
+                    ],
+                    'best': [
+                        {'$sort': {'_perf': -1, '_id': 1}},
+                        {'$limit': top_n}
+                    ],
+                    'worst': [
+                        {'$sort': {'_perf': 1, '_id': -1}},
+                        {'$limit': top_n}
+                    ]
+                }}
+            ]
+
+            results = await collection.aggregate(pipeline, allowDiskUse=False).to_list(length=1)
+            facets = results[0] if results else {}
+            by_sign = {bucket['_id']: bucket['n'] for bucket in facets.get('counts', [])}
+
+            return {
+                'total': sum(by_sign.values()),
+                'bullish': by_sign.get(1, 0),
+                'bearish': by_sign.get(-1, 0),
+                'best': facets.get('best', []),
+                # Bottom N, listed from best to worst like the best list
+                'worst': facets.get('worst', [])[::-1]
+            }
+
+        except Exception as e:
+            logger.error(f"Error summarizing performance for timeframe {timeframe}: {e}")
+            raise
+
     async def find_all_ordered_by_performance(self, limit: int = 1000) -> List[Dict[str, Any]]:
         """
         Get all candles ordered by 1d performance (descending)
         Groups all timeframes by symbol, ordered by their 1d performance
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             # Step 1: Get all 1d candles ordered by performance DESC
             candles_1d = await collection.find(
@@ -150,10 +239,50 @@ class CandleRepository:
             logger.error(f"Error finding candles ordered by performance: {e}")
             raise
 
+    async def iter_all_ordered_by_performance(self, limit: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream all candles ordered by 1d performance (descending) from a single cursor
+        Same order as find_all_ordered_by_performance, without a query per symbol
+        """
+        collection = self.collection
+        pipeline = [
+            # Symbols ranked by their 1d performance, one entry per symbol: token symbols
+            # are not unique, and a repeated symbol would repeat its whole $lookup below
+            {'$match': {'timeframe': '1d'}},
+            {'$group': {'_id': '$symbol', 'performance': {'$max': '$performance'}}},
+            {'$sort': {'performance': -1, '_id': 1}},
+            {'$limit': limit},
+            {'$group': {'_id': None, 'symbols': {'$push': '$_id'}}},
+            {'$unwind': {'path': '$symbols', 'includeArrayIndex': 'rank'}},
+            # All timeframes of each symbol (one candle per symbol + timeframe, served by
+            # the symbol_1_timeframe_1 index); the final $limit caps the total either way
+            {'$lookup': {
+                'from': self.collection_name,
+                'localField': 'symbols',
+                'foreignField': 'symbol',
+                'as': 'candle'
+            }},
+            {'$unwind': '$candle'},
+            {'$addFields': {
+                'candle.rank': '$rank',
+                'candle.tfOrder': {'$let': {
+                    'vars': {'i': {'$indexOfArray': [TIMEFRAME_ORDER, '$candle.timeframe']}},
+                    'in': {'$cond': [{'$lt': ['$$i', 0]}, 999, '$$i']}
+                }}
+            }},
+            {'$replaceRoot': {'newRoot': '$candle'}},
+            {'$sort': {'rank': 1, 'tfOrder': 1, 'timeframe': 1}},
+            {'$limit': limit},
+            {'$project': CANDLE_MODEL_PROJECTION}
+        ]
+
+        async for candle in collection.aggregate(pipeline, batchSize=CURSOR_BATCH_SIZE):
+            yield candle
+
     async def find_by_symbol(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Get candles for a specific symbol"""
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             cursor = collection.find({'symbol': symbol.upper()}).sort('timestamp', -1).limit(limit)
             return await cursor.to_list(length=limit)
         except Exception as e:
@@ -168,7 +297,7 @@ class CandleRepository:
     ) -> List[Dict[str, Any]]:
         """Get candles for a specific symbol and timeframe"""
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             cursor = collection.find({
                 'symbol': symbol.upper(),
                 'timeframe': timeframe
@@ -181,8 +310,8 @@ class CandleRepository:
     async def delete_old_candles(self, days_old: int = 7) -> int:
         """Delete candles older than specified days"""
         try:
-            collection = db_config.get_collection(self.collection_name)
-            cutoff_date = datetime.now() - timedelta(days=days_old)
+            collection = self.collection
+            cutoff_date = datetime.now(_UTC) - timedelta(days=days_old)
 
             result = await collection.delete_many({
                 'timestamp': {'$lt': cutoff_date}
@@ -197,7 +326,7 @@ class CandleRepository:
     async def get_latest_candle(self, symbol: str, timeframe: str) -> Optional[Dict[str, Any]]:
         """Get the most recent candle for a symbol and timeframe"""
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             candle = await collection.find_one(
                 {'symbol': symbol.upper(), 'timeframe': timeframe},
                 sort=[('timestamp', -1)]
@@ -210,19 +339,29 @@ class CandleRepository:
     async def count_candles(self) -> int:
         """Get total count of candles"""
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             return await collection.count_documents({})
         except Exception as e:
             logger.error(f"Error counting candles: {e}")
             raise
 
+    async def count_by_timeframe(self) -> Dict[str, int]:
+        """Get candle counts per timeframe in a single grouped scan"""
+        try:
+            collection = self.collection
+            pipeline = [{'$group': {'_id': '$timeframe', 'n': {'$sum': 1}}}]
+            return {doc['_id']: doc['n'] async for doc in collection.aggregate(pipeline)}
+        except Exception as e:
+            logger.error(f"Error counting candles by timeframe: {e}")
+            raise
+
     async def delete_all(self) -> int:
         """
         Delete ALL candles from the collection
         Used before full refresh to ensure data consistency
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             result = await collection.delete_many({})
             logger.info(f"Deleted ALL candles: {result.deleted_count} documents removed")
             return result.deleted_count
@@ -234,60 +373,56 @@ class CandleRepository:
         """
         UPSERT multiple candles at once (update if exists, insert if new)
         Uses symbol + timeframe as unique key
+        Writes unordered bulk_write chunks of BULK_CHUNK ops
         Returns count of upserted documents
         """
         try:
             if not candles:
                 return 0
 
-            # Remove duplicates based on symbol + timeframe
-            print(f"\n=== DEBUG: upsert_many called with {len(candles)} candles ===")
+            # Remove duplicates based on symbol + timeframe (first one wins)
             unique_candles = {}
             duplicates_found = 0
 
             for candle in candles:
-                key = f"{candle['symbol']}_{candle['timeframe']}"
+                key = (candle['symbol'], candle['timeframe'])
                 if key in unique_candles:
                     duplicates_found += 1
-                    print(f"WARNING: Duplicate found and removed: {candle['symbol']} - {candle['timeframe']}")
+                    logger.debug("Duplicate candle removed: %s - %s", candle['symbol'], candle['timeframe'])
                 else:
                     unique_candles[key] = candle
 
-            candles_to_upsert = list(unique_candles.values())
-            print(f"After removing {duplicates_found} duplicates: {len(candles_to_upsert)} unique candles to upsert")
-
-            collection = db_config.get_collection(self.collection_name)
-            now = datetime.now()
-            upserted_count = 0
+            if duplicates_found:
+                logger.warning(f"Removed {duplicates_found} duplicate candles before upsert")
 
-            for candle in candles_to_upsert:
-                result = await collection.update_one(
+            collection = self.collection
+            now = datetime.now(_UTC)
+            operations = [
+                UpdateOne(
+                    {'symbol': candle['symbol'], 'timeframe': candle['timeframe']},
                     {
-                        'symbol': candle['symbol'],
-                        'timeframe': candle['timeframe']
-                    },
-                    {
-                        '$set': {
-                            **candle,
-                            'updatedAt': now
-                        },
-                        '$setOnInsert': {
-                            'createdAt': now
-                        }
+                        '$set': {**candle, 'updatedAt': now},
+                        '$setOnInsert': {'createdAt': now}
                     },
                     upsert=True
                 )
+                for candle in unique_candles.values()
+            ]
 
-                if result.upserted_id or result.modified_count > 0:
-                    upserted_count += 1
+            upserted_count = 0
+            for i in range(0, len(operations), BULK_CHUNK):
+                result = await collection.bulk_write(
+                    operations[i:i + BULK_CHUNK],
+                    ordered=False,
+                    bypass_document_validation=True
+                )
+                upserted_count += result.upserted_count + result.modified_count
 
             logger.info(f"Upserted {upserted_count} candles")
-            print(f"=== DEBUG: Successfully upserted {upserted_count} candles ===\n")
             return upserted_count
 
         except Exception as e:
             logger.error(f"Error upserting candles: {e}")
-            print(f"ERROR upserting candles: {e}")
             raise
 
     async def insert_many(self, candles: List[Dict[str, Any]]) -> int:
@@ -300,7 +435,7 @@ class CandleRepository:
                 return 0
 
             # Remove duplicates based on symbol + timeframe
-            print(f"\n=== DEBUG: insert_many called with {len(candles)} candles ===")
+            logger.debug(f"insert_many called with {len(candles)} candles")
             unique_candles = {}
             duplicates_found = 0
 
@@ -308,17 +443,17 @@ class CandleRepository:
                 key = f"{candle['symbol']}_{candle['timeframe']}"
                 if key in unique_candles:
                     duplicates_found += 1
-                    print(f"WARNING: Duplicate found and removed: {candle['symbol']} - {candle['timeframe']}")
+                    logger.debug(f"Duplicate candle removed: {candle['symbol']} - {candle['timeframe']}")
                 else:
                     unique_candles[key] = candle
 
             candles_to_insert = list(unique_candles.values())
-            print(f"After removing {duplicates_found} duplicates: {len(candles_to_insert)} unique candles to insert")
+            logger.debug(f"After removing {duplicates_found} duplicates: {len(candles_to_insert)} unique candles to insert")
 
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             # Add timestamps
-            now = datetime.now()
+            now = datetime.now(_UTC)
             for candle in candles_to_insert:
                 candle['createdAt'] = now
                 candle['updatedAt'] = now
@@ -326,12 +461,83 @@ class CandleRepository:
             result = await collection.insert_many(candles_to_insert)
             inserted_count = len(result.inserted_ids)
             logger.info(f"Inserted {inserted_count} new candles")
-            print(f"=== DEBUG: Successfully inserted {inserted_count} candles ===\n")
             return inserted_count
 
         except Exception as e:
             logger.error(f"Error inserting multiple candles: {e}")
-            print(f"ERROR inserting candles: {e}")
+            raise
+
+    async def find_open_timestamps(
+        self,
+        symbols: List[str],
+        timeframes: List[str]
+    ) -> Dict[Tuple[str, str], Any]:
+        """
+        Get the stored openTimestamp of every (symbol, timeframe) candle in one query
+        Used to tell new candles from price snapshots of the same candle
+        """
+        try:
+            collection = self.collection
+            cursor = collection.find(
+                {'symbol': {'$in': symbols}, 'timeframe': {'$in': timeframes}},
+                {'symbol': 1, 'timeframe': 1, 'openTimestamp': 1, '_id': 0}
+            )
+            return {
+                (doc['symbol'], doc['timeframe']): doc.get('openTimestamp')
+                async for doc in cursor
+            }
+        except Exception as e:
+            logger.error(f"Error finding open timestamps: {e}")
+            raise
+
+    async def bulk_refresh(
+        self,
+        new_candles: List[Dict[str, Any]],
+        snapshots: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Write a refresh cycle in a single unordered bulk_write
+        New candles are fully upserted; snapshots only update close, high, low
+        and performance, and only while the stored candle has the same openTimestamp
+
+        Returns:
+            Number of candles inserted or modified
+        """
+        try:
+            now = datetime.now(_UTC)
+            operations = []
+
+            for candle in new_candles:
+                operations.append(UpdateOne(
+                    {'symbol': candle['symbol'], 'timeframe': candle['timeframe']},
+                    {
+                        '$set': {**candle, 'updatedAt': now},
+                        '$setOnInsert': {'createdAt': now}
+                    },
+                    upsert=True
+                ))
+
+            for candle in snapshots:
+                operations.append(UpdateOne(
+                    {
+                        'symbol': candle['symbol'],
+                        'timeframe': candle['timeframe'],
+                        'openTimestamp': candle['openTimestamp']
+                    },
+                    {'$set': {
+                        **{field: candle[field] for field in SNAPSHOT_FIELDS},
+                        'updatedAt': now
+                    }}
+                ))
+
+            if not operations:
+                return 0
+
+            result = await self.collection.bulk_write(operations, ordered=False)
+            return result.upserted_count + result.modified_count
+
+        except Exception as e:
+            logger.error(f"Error bulk refreshing candles: {e}")
             raise
 
     async def update_price_snapshot(
@@ -345,7 +551,7 @@ class CandleRepository:
         Usado para snapshots de precios en tiempo real cada 1 minuto
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             filter_query = {
                 'symbol': symbol,
@@ -355,7 +561,7 @@ class CandleRepository:
             update_query = {
                 '$set': {
                     **update_data,
-                    'updatedAt': datetime.now()
+                    'updatedAt': datetime.now(_UTC)
                 }
             }
 
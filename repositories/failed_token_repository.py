@@ -1,10 +1,17 @@
 import logging
 from typing import List, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import cached_property
 from config.database import db_config
 
 logger = logging.getLogger(__name__)
 
+# Stored timestamps are timezone-aware UTC (BSON dates are UTC)
+_UTC = timezone.utc
+
+# Symbols per $in delete, keeps each command well under the BSON size limit
+DELETE_CHUNK = 1000
+
 class FailedTokenRepository:
     """
     Repository for Failed Token operations
@@ -14,13 +21,35 @@ class FailedTokenRepository:
     def __init__(self):
         self.collection_name = 'trinityTokensNotInOKX'
 
+    @cached_property
+    def collection(self):
+        """Get the MongoDB collection"""
+        return db_config.get_collection(self.collection_name)
+
+    async def ensure_indexes(self) -> None:
+        """Create indexes for the hot query patterns (idempotent)"""
+        try:
+            collection = self.collection
+
+            # find_by_symbols: covers the symbol/name/market_cap projection (no document fetch)
+            await collection.create_index(
+                [('symbol', 1), ('name', 1), ('market_cap', 1)],
+                name='symbol_covered',
+                background=True
+            )
+
+            logger.info(f"Indexes ensured for {self.collection_name}")
+
+        except Exception as e:
+            logger.error(f"Error creating indexes for {self.collection_name}: {e}")
+
     async def delete_all(self) -> int:
         """
         Delete ALL failed tokens from the collection
         Used before full refresh to ensure fresh historical data
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             result = await collection.delete_many({})
             logger.info(f"Deleted ALL failed tokens: {result.deleted_count} documents removed")
             return result.deleted_count
@@ -28,13 +57,14 @@ class FailedTokenRepository:
             logger.error(f"Error deleting all failed tokens: {e}")
             raise
 
-    async def delete_by_symbols(self, symbols: List[str]) -> int:
+    async def delete_by_symbols(self, symbols: List[str], chunk_size: int = DELETE_CHUNK) -> int:
         """
         Delete specific tokens by their symbols
         Used to remove tokens that are now available in OKX
 
         Args:
             symbols: List of token symbols to delete
+            chunk_size: Symbols per delete_many ($in) command
 
         Returns:
             Number of deleted documents
@@ -43,12 +73,19 @@ class FailedTokenRepository:
             if not symbols:
                 return 0
 
-            collection = db_config.get_collection(self.collection_name)
-            result = await collection.delete_many({
-                'symbol': {'$in': [s.upper() for s in symbols]}
-            })
-            logger.info(f"Deleted {result.deleted_count} tokens that are now available in OKX: {symbols}")
-            return result.deleted_count
+            collection = self.collection
+            upper_symbols = [s.upper() for s in symbols]
+            deleted_count = 0
+
+            # One round-trip per chunk of symbols
+            for start in range(0, len(upper_symbols), chunk_size):
+                result = await collection.delete_many({
+                    'symbol': {'$in': upper_symbols[start:start + chunk_size]}
+                })
+                deleted_count += result.deleted_count
+
+            logger.info(f"Deleted {deleted_count} tokens that are now available in OKX (checked {len(symbols)} symbols)")
+            return deleted_count
         except Exception as e:
             logger.error(f"Error deleting tokens by symbols: {e}")
             raise
@@ -67,20 +104,19 @@ class FailedTokenRepository:
         try:
             if not failed_tokens:
                 logger.info("No failed tokens to upsert")
-                print("DEBUG: No failed tokens to upsert")
                 return 0
 
-            print(f"\n=== DEBUG: Starting upsert of {len(failed_tokens)} failed tokens ===")
-            collection = db_config.get_collection(self.collection_name)
+            logger.debug(f"Starting upsert of {len(failed_tokens)} failed tokens")
+            collection = self.collection
 
             # Add/update timestamps
-            now = datetime.now()
+            now = datetime.now(_UTC)
             upserted_count = 0
 
             for token in failed_tokens:
                 token['updatedAt'] = now
 
-                print(f"Upserting token: {token['symbol']}")
+                logger.debug(f"Upserting failed token: {token['symbol']}")
 
                 # Upsert: update if exists, insert if not
                 result = await collection.update_one(
@@ -94,15 +130,13 @@ class FailedTokenRepository:
 
                 if result.upserted_id or result.modified_count > 0:
                     upserted_count += 1
-                    print(f"Success for {token['symbol']}: upserted_id={result.upserted_id}, modified={result.modified_count}")
+                    logger.debug(f"Upserted {token['symbol']}: upserted_id={result.upserted_id}, modified={result.modified_count}")
 
             logger.info(f"Upserted {upserted_count} failed tokens into {self.collection_name}")
-            print(f"=== DEBUG: Completed upsert - {upserted_count} tokens saved to {self.collection_name} ===\n")
             return upserted_count
 
         except Exception as e:
             logger.error(f"Error upserting failed tokens: {e}")
-            print(f"ERROR upserting failed tokens: {e}")
             raise
 
     async def insert_many(self, failed_tokens: List[Dict[str, Any]]) -> int:
@@ -115,16 +149,21 @@ class FailedTokenRepository:
                 logger.info("No failed tokens to insert")
                 return 0
 
-            collection = db_config.get_collection(self.collection_name)
-
-            # Add timestamps
-            now = datetime.now()
-            for token in failed_tokens:
-                token['timestamp'] = now
-                token['createdAt'] = now
-
-            result = await collection.insert_many(failed_tokens)
-            inserted_count = len(result.inserted_ids)
+            collection = self.collection
+
+            # Add timestamps on copies: the driver also adds _id to the inserted
+            # documents, and the caller may be sharing these dicts concurrently
+            now = datetime.now(_UTC)
+            documents = [{**token, 'timestamp': now, 'createdAt': now} for token in failed_tokens]
+
+            # Single token (incremental updates): plain insert, no bulk write machinery
+            if len(documents) == 1:
+                await collection.insert_one(documents[0])
+                inserted_count = 1
+            else:
+                # Unordered: the server may apply the batch in parallel and keeps going past a bad document
+                result = await collection.insert_many(documents, ordered=False)
+                inserted_count = len(result.inserted_ids)
             logger.info(f"Inserted {inserted_count} failed tokens into {self.collection_name}")
             return inserted_count
 
@@ -138,7 +177,7 @@ class FailedTokenRepository:
         Returns list sorted by symbol alphabetically
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             cursor = collection.find().sort('symbol', 1).limit(limit)
             failed_tokens = await cursor.to_list(length=limit)
             logger.info(f"Found {len(failed_tokens)} failed tokens")
@@ -150,7 +189,7 @@ class FailedTokenRepository:
     async def count_failed_tokens(self) -> int:
         """Get total count of failed tokens"""
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             count = await collection.count_documents({})
             return count
         except Exception as e:
@@ -160,39 +199,66 @@ class FailedTokenRepository:
     async def find_by_symbol(self, symbol: str) -> Dict[str, Any]:
         """Get failed token by symbol"""
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             failed_token = await collection.find_one({'symbol': symbol.upper()})
             return failed_token
         except Exception as e:
             logger.error(f"Error finding failed token by symbol: {e}")
             raise
 
+    async def find_by_symbols(self, symbols: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get the failed tokens for many symbols in a single query
+
+        Args:
+            symbols: List of token symbols to look up
+
+        Returns:
+            Failed token documents with symbol, name and market_cap (no _id,
+            so the query is covered by the symbol_covered index it is pinned to)
+        """
+        try:
+            if not symbols:
+                return []
+
+            collection = self.collection
+            cursor = collection.find(
+                {'symbol': {'$in': [s.upper() for s in symbols]}},
+                {'symbol': 1, 'name': 1, 'market_cap': 1, '_id': 0}
+            ).hint('symbol_covered')
+            return await cursor.to_list(length=None)
+        except Exception as e:
+            logger.error(f"Error finding failed tokens by symbols: {e}")
+            raise
+
     async def get_statistics(self) -> Dict[str, Any]:
         """
         Get statistics about failed tokens
-        Returns aggregated data for analysis
+        Returns aggregated data for analysis (total and reasons in one round-trip)
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
-
-            total_failed = await collection.count_documents({})
+            collection = self.collection
 
-            # Group by reason
+            # Count and group by reason over a single scan
             pipeline = [
                 {
-                    '$group': {
-                        '_id': '$reason',
-                        'count': {'$sum': 1}
+                    '$facet': {
+                        'total': [{'$count': 'n'}],
+                        'reasons': [
+                            {'$group': {'_id': '$reason', 'count': {'$sum': 1}}},
+                            {'$limit': 100}
+                        ]
                     }
                 }
             ]
 
-            reasons_cursor = collection.aggregate(pipeline)
-            reasons = await reasons_cursor.to_list(length=100)
+            results = await collection.aggregate(pipeline).to_list(length=1)
+            facets = results[0] if results else {}
+            total = facets.get('total') or [{}]
 
             return {
-                'total_failed': total_failed,
-                'failure_reasons': reasons
+                'total_failed': total[0].get('n', 0),
+                'failure_reasons': facets.get('reasons', [])
             }
         except Exception as e:
             logger.error(f"Error getting failed token statistics: {e}")
@@ -1,10 +1,15 @@
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
 from config.database import db_config
 
 logger = logging.getLogger(__name__)
 
+# Stored timestamps are timezone-aware UTC (BSON dates are UTC)
+_UTC = timezone.utc
+
 class MarketAnalysisRepository:
     """
     Repository for Market Analysis operations
@@ -14,7 +19,10 @@ class MarketAnalysisRepository:
     def __init__(self):
         self.collection_name = 'marketAnalysis'
 
-    @property
+        # Guards the delete -> insert sequence against interleaving
+        self._write_lock = asyncio.Lock()
+
+    @cached_property
     def collection(self):
         """Get the MongoDB collection"""
         return db_config.get_collection(self.collection_name)
@@ -29,28 +37,30 @@ class MarketAnalysisRepository:
         Always replaces the entire document to ensure fresh data.
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
-
-            # Set timestamps
-            current_time = datetime.now()
-            analysis_data['updatedAt'] = current_time
-
-            # Check if any document exists
-            existing = await collection.find_one({})
-
-            if not existing:
-                # First time: set createdAt
-                analysis_data['createdAt'] = current_time
-                action = "created"
-            else:
-                # Update: preserve original createdAt
-                analysis_data['createdAt'] = existing.get('createdAt', current_time)
-                action = "updated"
-
-            # Delete all existing documents and insert the new one
-            # This ensures we only have ONE document with ALL timeframes
-            await collection.delete_many({})
-            result = await collection.insert_one(analysis_data)
+            collection = self.collection
+
+            # Serialize the delete -> insert critical section for concurrent callers
+            async with self._write_lock:
+                # Set timestamps
+                current_time = datetime.now(_UTC)
+                analysis_data['updatedAt'] = current_time
+
+                # Check if any document exists (only createdAt is needed)
+                existing = await collection.find_one({}, projection={'createdAt': 1, '_id': 0})
+
+                if existing is None:
+                    # First time: set createdAt
+                    analysis_data['createdAt'] = current_time
+                    action = "created"
+                else:
+                    # Update: preserve original createdAt
+                    analysis_data['createdAt'] = existing.get('createdAt', current_time)
+                    action = "updated"
+
+                # Delete all existing documents and insert the new one
+                # This ensures we only have ONE document with ALL timeframes
+                await collection.delete_many({})
+                result = await collection.insert_one(analysis_data)
 
             direction = analysis_data.get('direction', 'UNKNOWN')
             logger.info(f"Market analysis {action}: {direction}")
@@ -76,7 +86,7 @@ class MarketAnalysisRepository:
             The single market analysis document with nested timeframe data
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             # Get the single document (there should only be one)
             analysis = await collection.find_one({})
@@ -95,7 +105,7 @@ class MarketAnalysisRepository:
             List of all market analysis documents
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             cursor = collection.find({})
             analyses = await cursor.to_list(length=None)
@@ -111,7 +121,7 @@ class MarketAnalysisRepository:
         Count total market analysis records
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             count = await collection.count_documents({})
             return count
 
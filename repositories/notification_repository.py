@@ -1,10 +1,15 @@
 import logging
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from bson import ObjectId
 from config.database import db_config
 
 logger = logging.getLogger(__name__)
 
+# Stored timestamps are timezone-aware UTC (BSON dates are UTC)
+_UTC = timezone.utc
+
 class NotificationRepository:
     """
     Repository for Notification operations
@@ -14,7 +19,7 @@ class NotificationRepository:
     def __init__(self):
         self.collection_name = 'trinityNotifications'
 
-    @property
+    @cached_property
     def collection(self):
         """Get the MongoDB collection"""
         return db_config.get_collection(self.collection_name)
@@ -30,11 +35,11 @@ class NotificationRepository:
             Inserted notification with ID
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             # Add timestamp if not present
             if 'timestamp' not in notification_data:
-                notification_data['timestamp'] = datetime.now()
+                notification_data['timestamp'] = datetime.now(_UTC)
 
             if 'read' not in notification_data:
                 notification_data['read'] = False
@@ -63,10 +68,10 @@ class NotificationRepository:
             if not notifications:
                 return 0
 
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             # Add timestamps
-            now = datetime.now()
+            now = datetime.now(_UTC)
             for notification in notifications:
                 if 'timestamp' not in notification:
                     notification['timestamp'] = now
@@ -101,7 +106,7 @@ class NotificationRepository:
             List of notifications sorted by timestamp (newest first)
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             query = {}
             if unread_only:
@@ -133,7 +138,7 @@ class NotificationRepository:
             List of notifications of specified type
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             cursor = collection.find({'type': notification_type}).sort('timestamp', -1).limit(limit)
             notifications = await cursor.to_list(length=limit)
@@ -155,8 +160,7 @@ class NotificationRepository:
             True if successful, False otherwise
         """
         try:
-            from bson import ObjectId
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             result = await collection.update_one(
                 {'_id': ObjectId(notification_id)},
@@ -169,6 +173,22 @@ class NotificationRepository:
             logger.error(f"Error marking notification as read: {e}")
             raise
 
+    async def find_unread_ids(self) -> List[ObjectId]:
+        """
+        Get the IDs of all unread notifications
+
+        Returns:
+            List of ObjectIds
+        """
+        try:
+            collection = self.collection
+            cursor = collection.find({'read': False}, {'_id': 1})
+            return [doc['_id'] async for doc in cursor]
+
+        except Exception as e:
+            logger.error(f"Error finding unread notification ids: {e}")
+            raise
+
     async def mark_all_as_read(self) -> int:
         """
         Mark all notifications as read
@@ -177,7 +197,7 @@ class NotificationRepository:
             Number of notifications marked as read
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             result = await collection.update_many(
                 {'read': False},
@@ -199,7 +219,7 @@ class NotificationRepository:
             Number of unread notifications
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             count = await collection.count_documents({'read': False})
             return count
 
@@ -218,9 +238,9 @@ class NotificationRepository:
             Number of deleted notifications
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
-            cutoff_date = datetime.now() - timedelta(days=days)
+            cutoff_date = datetime.now(_UTC) - timedelta(days=days)
             result = await collection.delete_many({
                 'timestamp': {'$lt': cutoff_date}
             })
@@ -240,7 +260,7 @@ class NotificationRepository:
             Number of deleted notifications
         """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             result = await collection.delete_many({})
 
             logger.info(f"Deleted ALL {result.deleted_count} notifications")
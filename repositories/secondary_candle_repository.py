@@ -1,12 +1,17 @@
 import logging
 from typing import Dict, Any, Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import cached_property
+from pymongo import UpdateOne
 from config.database import secondary_db_config
-import asyncio
+from repositories._retry import RetryableRepository
 
 logger = logging.getLogger(__name__)
 
-class SecondaryCandleRepository:
+# Stored timestamps are timezone-aware UTC (BSON dates are UTC)
+_UTC = timezone.utc
+
+class SecondaryCandleRepository(RetryableRepository):
     """
     Repository for Candle operations in SECONDARY database
     Handles CRUD operations for trinity_performance_candles collection
@@ -15,10 +20,8 @@ class SecondaryCandleRepository:
 
     def __init__(self):
         self.collection_name = 'trinity_performance_candles'
-        self.max_retries = 3
-        self.retry_delay = 2  # seconds
 
-    @property
+    @cached_property
     def collection(self):
         """Get the MongoDB collection from secondary database"""
         return secondary_db_config.get_collection(self.collection_name)
@@ -33,29 +36,10 @@ class SecondaryCandleRepository:
         Returns:
             Dictionary with operation result
         """
-        for attempt in range(self.max_retries):
-            try:
-                result = await self._bulk_upsert_candles(candles_data)
-                if attempt > 0:
-                    logger.info(f"[SECONDARY DB] Successfully saved candles after {attempt + 1} attempts")
-                return result
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    logger.warning(
-                        f"[SECONDARY DB] Attempt {attempt + 1}/{self.max_retries} failed: {e}. "
-                        f"Retrying in {self.retry_delay}s..."
-                    )
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    logger.error(
-                        f"[SECONDARY DB] All {self.max_retries} attempts failed. "
-                        f"Candles NOT saved to secondary database: {e}"
-                    )
-                    return {
-                        'status': 'error',
-                        'message': f'Failed after {self.max_retries} attempts: {str(e)}',
-                        'action': 'failed'
-                    }
+        return await self._with_retry(
+            lambda: self._bulk_upsert_candles(candles_data),
+            op_name="bulk_upsert_candles"
+        )
 
     async def _bulk_upsert_candles(self, candles_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -68,7 +52,7 @@ class SecondaryCandleRepository:
             Dictionary with operation result
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             if not candles_data:
                 return {
@@ -79,9 +63,8 @@ class SecondaryCandleRepository:
                 }
 
             # Prepare bulk operations
-            from pymongo import UpdateOne
             operations = []
-            current_time = datetime.now()
+            current_time = datetime.now(_UTC)
 
             for candle in candles_data:
                 # Add/update timestamps
@@ -131,29 +114,10 @@ class SecondaryCandleRepository:
         Returns:
             Dictionary with operation result
         """
-        for attempt in range(self.max_retries):
-            try:
-                result = await self._delete_candles_by_symbol(symbol)
-                if attempt > 0:
-                    logger.info(f"[SECONDARY DB] Successfully deleted candles after {attempt + 1} attempts")
-                return result
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    logger.warning(
-                        f"[SECONDARY DB] Attempt {attempt + 1}/{self.max_retries} failed: {e}. "
-                        f"Retrying in {self.retry_delay}s..."
-                    )
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    logger.error(
-                        f"[SECONDARY DB] All {self.max_retries} attempts failed. "
-                        f"Candles NOT deleted from secondary database: {e}"
-                    )
-                    return {
-                        'status': 'error',
-                        'message': f'Failed after {self.max_retries} attempts: {str(e)}',
-                        'action': 'failed'
-                    }
+        return await self._with_retry(
+            lambda: self._delete_candles_by_symbol(symbol),
+            op_name="delete_candles_by_symbol"
+        )
 
     async def _delete_candles_by_symbol(self, symbol: str) -> Dict[str, Any]:
         """
@@ -166,7 +130,7 @@ class SecondaryCandleRepository:
             Dictionary with operation result
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
             result = await collection.delete_many({'symbol': symbol.upper()})
 
             logger.info(
@@ -196,7 +160,7 @@ class SecondaryCandleRepository:
             Number of candles
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
             query = {}
             if timeframe:
                 query['timeframe'] = timeframe
@@ -1,12 +1,16 @@
 import logging
 from typing import Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import cached_property
 from config.database import secondary_db_config
-import asyncio
+from repositories._retry import RetryableRepository
 
 logger = logging.getLogger(__name__)
 
-class SecondaryConfigRepository:
+# Stored timestamps are timezone-aware UTC (BSON dates are UTC)
+_UTC = timezone.utc
+
+class SecondaryConfigRepository(RetryableRepository):
     """
     Repository for Config operations in SECONDARY database
     Handles CRUD operations for trinity_performance_config collection
@@ -16,11 +20,9 @@ class SecondaryConfigRepository:
 
     def __init__(self):
         self.collection_name = 'trinity_performance_config'
-        self.max_retries = 3
-        self.retry_delay = 2  # seconds
         self.config_type = 'app_config'  # Singleton identifier (same as primary DB)
 
-    @property
+    @cached_property
     def collection(self):
         """Get the MongoDB collection from secondary database"""
         return secondary_db_config.get_collection(self.collection_name)
@@ -35,29 +37,10 @@ class SecondaryConfigRepository:
         Returns:
             Dictionary with operation result
         """
-        for attempt in range(self.max_retries):
-            try:
-                result = await self._upsert_config(config_data)
-                if attempt > 0:
-                    logger.info(f"[SECONDARY DB] Successfully saved config after {attempt + 1} attempts")
-                return result
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    logger.warning(
-                        f"[SECONDARY DB] Attempt {attempt + 1}/{self.max_retries} failed: {e}. "
-                        f"Retrying in {self.retry_delay}s..."
-                    )
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    logger.error(
-                        f"[SECONDARY DB] All {self.max_retries} attempts failed. "
-                        f"Config NOT saved to secondary database: {e}"
-                    )
-                    return {
-                        'status': 'error',
-                        'message': f'Failed after {self.max_retries} attempts: {str(e)}',
-                        'action': 'failed'
-                    }
+        return await self._with_retry(
+            lambda: self._upsert_config(config_data),
+            op_name="upsert_config"
+        )
 
     async def _upsert_config(self, config_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -71,10 +54,10 @@ class SecondaryConfigRepository:
             Dictionary with operation result
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             # Set timestamps (using snake_case like primary DB)
-            current_time = datetime.now()
+            current_time = datetime.now(_UTC)
             config_data['last_updated'] = current_time
 
             # Ensure type field exists (same as primary DB)
@@ -123,7 +106,7 @@ class SecondaryConfigRepository:
             Dictionary with config data or None if not found
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
             config = await collection.find_one({'type': self.config_type})
             return config
 
@@ -139,7 +122,7 @@ class SecondaryConfigRepository:
             Number of config documents
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
             count = await collection.count_documents({})
             return count
 
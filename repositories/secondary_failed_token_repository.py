@@ -1,27 +1,44 @@
 import logging
-from typing import Dict, Any, List
-from datetime import datetime
+from typing import Dict, Any, List, Iterable, Collection
+from datetime import datetime, timezone
+from functools import cached_property
+from itertools import islice
+from operator import attrgetter
+from pymongo import UpdateOne, WriteConcern
 from config.database import secondary_db_config
-import asyncio
+from repositories._retry import RetryableRepository
 
 logger = logging.getLogger(__name__)
 
-class SecondaryFailedTokenRepository:
+# Stored timestamps are timezone-aware UTC (BSON dates are UTC)
+_UTC = timezone.utc
+
+# Maximum number of write operations sent in a single bulk_write call
+BULK_CHUNK = 1000
+
+_UPSERTED_COUNT = attrgetter('upserted_count')
+_MODIFIED_COUNT = attrgetter('modified_count')
+
+class SecondaryFailedTokenRepository(RetryableRepository):
     """
     Repository for Failed Token operations in SECONDARY database
     Handles CRUD operations for trinity_Tokens_Performance_NotInOKX collection
     This is a replica/backup of tokens not available in OKX
+    Writes bypass document validation: the data is mirrored from the primary
     """
 
     def __init__(self):
         self.collection_name = 'trinity_Tokens_Performance_NotInOKX'
-        self.max_retries = 3
-        self.retry_delay = 2  # seconds
+        self.retry_budget = 30  # seconds, total time across all attempts
+        # Backup writes only need the primary node's ack, not a majority
+        self.write_concern = WriteConcern(w=1)
 
-    @property
+    @cached_property
     def collection(self):
-        """Get the MongoDB collection from secondary database"""
-        return secondary_db_config.get_collection(self.collection_name)
+        """Get the MongoDB collection from secondary database (backup write concern)"""
+        return secondary_db_config.get_collection(self.collection_name).with_options(
+            write_concern=self.write_concern
+        )
 
     async def bulk_upsert_failed_tokens_with_retry(self, failed_tokens_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -33,29 +50,26 @@ class SecondaryFailedTokenRepository:
         Returns:
             Dictionary with operation result
         """
-        for attempt in range(self.max_retries):
-            try:
-                result = await self._bulk_upsert_failed_tokens(failed_tokens_data)
-                if attempt > 0:
-                    logger.info(f"[SECONDARY DB] Successfully saved failed tokens after {attempt + 1} attempts")
-                return result
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    logger.warning(
-                        f"[SECONDARY DB] Attempt {attempt + 1}/{self.max_retries} failed: {e}. "
-                        f"Retrying in {self.retry_delay}s..."
-                    )
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    logger.error(
-                        f"[SECONDARY DB] All {self.max_retries} attempts failed. "
-                        f"Failed tokens NOT saved to secondary database: {e}"
-                    )
-                    return {
-                        'status': 'error',
-                        'message': f'Failed after {self.max_retries} attempts: {str(e)}',
-                        'action': 'failed'
-                    }
+        # Validate up-front: malformed payloads would otherwise fail on every retry
+        if not failed_tokens_data:
+            return {
+                'status': 'success',
+                'action': 'no_data',
+                'upserted': 0,
+                'modified': 0
+            }
+        if any('symbol' not in token for token in failed_tokens_data):
+            logger.error("[SECONDARY DB] Failed tokens NOT saved: every token requires a symbol")
+            return {
+                'status': 'error',
+                'message': 'symbol required',
+                'action': 'failed'
+            }
+
+        return await self._with_retry(
+            lambda: self._bulk_upsert_failed_tokens(failed_tokens_data),
+            op_name="bulk_upsert_failed_tokens"
+        )
 
     async def _bulk_upsert_failed_tokens(self, failed_tokens_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -68,7 +82,7 @@ class SecondaryFailedTokenRepository:
             Dictionary with operation result
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             if not failed_tokens_data:
                 return {
@@ -78,39 +92,51 @@ class SecondaryFailedTokenRepository:
                     'modified': 0
                 }
 
-            # Prepare bulk operations
-            from pymongo import UpdateOne
-            operations = []
-            current_time = datetime.now()
-
-            for token in failed_tokens_data:
-                # Add/update timestamps
-                token['updatedAt'] = current_time
-                if 'createdAt' not in token:
-                    token['createdAt'] = current_time
-
-                operations.append(
-                    UpdateOne(
-                        {'symbol': token['symbol']},
-                        {'$set': token},
-                        upsert=True
-                    )
+            # Build bulk operations lazily; createdAt (and any _id added by the
+            # primary insert) only belong in $setOnInsert, never in $set
+            current_time = datetime.now(_UTC)
+
+            operations = (
+                UpdateOne(
+                    {'symbol': token['symbol']},
+                    {
+                        '$set': {
+                            **{k: v for k, v in token.items() if k not in ('_id', 'createdAt')},
+                            'updatedAt': current_time
+                        },
+                        '$setOnInsert': {'createdAt': token.get('createdAt', current_time)}
+                    },
+                    upsert=True
                 )
+                for token in failed_tokens_data
+            )
 
-            # Execute bulk write
-            result = await collection.bulk_write(operations, ordered=False)
+            # Execute bulk write in chunks so only BULK_CHUNK ops are held at once
+            results = []
+            while True:
+                chunk = list(islice(operations, BULK_CHUNK))
+                if not chunk:
+                    break
+                results.append(await collection.bulk_write(
+                    chunk,
+                    ordered=False,
+                    bypass_document_validation=True
+                ))
+
+            upserted = sum(map(_UPSERTED_COUNT, results))
+            modified = sum(map(_MODIFIED_COUNT, results))
 
             logger.info(
                 f"[SECONDARY DB] Failed tokens synced: "
-                f"upserted={result.upserted_count}, modified={result.modified_count} "
+                f"upserted={upserted}, modified={modified} "
                 f"-> trinity_Tokens_Performance_NotInOKX"
             )
 
             return {
                 'status': 'success',
                 'action': 'upserted',
-                'upserted': result.upserted_count,
-                'modified': result.modified_count,
+                'upserted': upserted,
+                'modified': modified,
                 'total': len(failed_tokens_data)
             }
 
@@ -125,29 +151,10 @@ class SecondaryFailedTokenRepository:
         Returns:
             Dictionary with operation result
         """
-        for attempt in range(self.max_retries):
-            try:
-                result = await self._delete_all()
-                if attempt > 0:
-                    logger.info(f"[SECONDARY DB] Successfully deleted failed tokens after {attempt + 1} attempts")
-                return result
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    logger.warning(
-                        f"[SECONDARY DB] Attempt {attempt + 1}/{self.max_retries} failed: {e}. "
-                        f"Retrying in {self.retry_delay}s..."
-                    )
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    logger.error(
-                        f"[SECONDARY DB] All {self.max_retries} attempts failed. "
-                        f"Failed tokens NOT deleted from secondary database: {e}"
-                    )
-                    return {
-                        'status': 'error',
-                        'message': f'Failed after {self.max_retries} attempts: {str(e)}',
-                        'action': 'failed'
-                    }
+        return await self._with_retry(
+            lambda: self._delete_all(),
+            op_name="delete_all"
+        )
 
     async def _delete_all(self) -> Dict[str, Any]:
         """
@@ -157,7 +164,7 @@ class SecondaryFailedTokenRepository:
             Dictionary with operation result
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
             result = await collection.delete_many({})
 
             logger.info(
@@ -183,7 +190,7 @@ class SecondaryFailedTokenRepository:
             Number of failed tokens
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
             count = await collection.count_documents({})
             return count
 
@@ -191,46 +198,30 @@ class SecondaryFailedTokenRepository:
             logger.error(f"[SECONDARY DB] Error counting failed tokens: {e}")
             return 0
 
-    async def delete_by_symbols_with_retry(self, symbols: list) -> Dict[str, Any]:
+    async def delete_by_symbols_with_retry(self, symbols: Iterable[str]) -> Dict[str, Any]:
         """
         Delete specific failed tokens by symbols with retry logic
 
         Args:
-            symbols: List of token symbols to delete
+            symbols: Token symbols to delete (any iterable, e.g. list or set)
 
         Returns:
             Dictionary with operation result
         """
-        for attempt in range(self.max_retries):
-            try:
-                result = await self._delete_by_symbols(symbols)
-                if attempt > 0:
-                    logger.info(f"[SECONDARY DB] Successfully deleted failed tokens after {attempt + 1} attempts")
-                return result
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    logger.warning(
-                        f"[SECONDARY DB] Attempt {attempt + 1}/{self.max_retries} failed: {e}. "
-                        f"Retrying in {self.retry_delay}s..."
-                    )
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    logger.error(
-                        f"[SECONDARY DB] All {self.max_retries} attempts failed. "
-                        f"Failed tokens NOT deleted from secondary database: {e}"
-                    )
-                    return {
-                        'status': 'error',
-                        'message': f'Failed after {self.max_retries} attempts: {str(e)}',
-                        'action': 'failed'
-                    }
-
-    async def _delete_by_symbols(self, symbols: list) -> Dict[str, Any]:
+        # Normalize once (uppercase + dedupe) so retries reuse the same $in list
+        normalized = tuple({s.upper() for s in symbols})
+
+        return await self._with_retry(
+            lambda: self._delete_by_symbols(normalized),
+            op_name="delete_by_symbols"
+        )
+
+    async def _delete_by_symbols(self, symbols: Collection[str]) -> Dict[str, Any]:
         """
         Internal method to delete specific failed tokens by symbols
 
         Args:
-            symbols: List of token symbols to delete
+            symbols: Already uppercased and deduplicated token symbols
 
         Returns:
             Dictionary with operation result
@@ -243,9 +234,9 @@ class SecondaryFailedTokenRepository:
                     'deleted_count': 0
                 }
 
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
             result = await collection.delete_many({
-                'symbol': {'$in': [s.upper() for s in symbols]}
+                'symbol': {'$in': list(symbols)}
             })
 
             logger.info(
@@ -1,27 +1,40 @@
 import logging
 from typing import Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import cached_property
+from pymongo import WriteConcern
 from config.database import secondary_db_config
+from repositories._retry import RetryableRepository
 import asyncio
 
 logger = logging.getLogger(__name__)
 
-class SecondaryMarketAnalysisRepository:
+# Stored timestamps are timezone-aware UTC (BSON dates are UTC)
+_UTC = timezone.utc
+
+class SecondaryMarketAnalysisRepository(RetryableRepository):
     """
     Repository for Market Analysis operations in SECONDARY database (sample_mflix)
     Handles CRUD operations for trinity_performance_marketAnalysis collection
     This is a replica/backup of the main market analysis data
+    Writes bypass document validation: the data is mirrored from the primary
     """
 
     def __init__(self):
         self.collection_name = 'trinity_performance_marketAnalysis'
-        self.max_retries = 3
-        self.retry_delay = 2  # seconds
+        self.retry_budget = 30  # seconds, total time across all attempts
+        # Backup writes only need the primary node's ack, not a majority
+        self.write_concern = WriteConcern(w=1)
+
+        # Guards the replace -> prune sequence against interleaving
+        self._write_lock = asyncio.Lock()
 
-    @property
+    @cached_property
     def collection(self):
-        """Get the MongoDB collection from secondary database"""
-        return secondary_db_config.get_collection(self.collection_name)
+        """Get the MongoDB collection from secondary database (backup write concern)"""
+        return secondary_db_config.get_collection(self.collection_name).with_options(
+            write_concern=self.write_concern
+        )
 
     async def insert_analysis_with_retry(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -37,29 +50,19 @@ class SecondaryMarketAnalysisRepository:
         Returns:
             Dictionary with operation result
         """
-        for attempt in range(self.max_retries):
-            try:
-                result = await self._insert_analysis(analysis_data)
-                if attempt > 0:
-                    logger.info(f"[SECONDARY DB] Successfully saved after {attempt + 1} attempts")
-                return result
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    logger.warning(
-                        f"[SECONDARY DB] Attempt {attempt + 1}/{self.max_retries} failed: {e}. "
-                        f"Retrying in {self.retry_delay}s..."
-                    )
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    logger.error(
-                        f"[SECONDARY DB] All {self.max_retries} attempts failed. "
-                        f"Data NOT saved to secondary database: {e}"
-                    )
-                    return {
-                        'status': 'error',
-                        'message': f'Failed after {self.max_retries} attempts: {str(e)}',
-                        'action': 'failed'
-                    }
+        # Validate up-front: malformed payloads would otherwise fail on every retry
+        if not analysis_data:
+            logger.error("[SECONDARY DB] Market analysis NOT saved: empty payload")
+            return {
+                'status': 'error',
+                'message': 'analysis data is required',
+                'action': 'failed'
+            }
+
+        return await self._with_retry(
+            lambda: self._insert_analysis(analysis_data),
+            op_name="insert_analysis"
+        )
 
     async def _insert_analysis(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -75,28 +78,40 @@ class SecondaryMarketAnalysisRepository:
             Dictionary with operation result
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
 
-            # Set timestamps
-            current_time = datetime.now()
-            analysis_data['updatedAt'] = current_time
+            # Serialize the replace -> prune sequence for concurrent callers
+            async with self._write_lock:
+                # Set timestamps
+                current_time = datetime.now(_UTC)
+                analysis_data['updatedAt'] = current_time
 
-            # Check if any document exists
-            existing = await collection.find_one({})
+                # Check if any document exists (its _id is kept, createdAt is preserved)
+                existing = await collection.find_one({}, projection={'createdAt': 1})
 
-            if not existing:
-                # First time: set createdAt
-                analysis_data['createdAt'] = current_time
-                action = "created"
-            else:
-                # Update: preserve original createdAt
-                analysis_data['createdAt'] = existing.get('createdAt', current_time)
-                action = "updated"
-
-            # Delete all existing documents and insert the new one
-            # This ensures we only have ONE document with ALL timeframes
-            await collection.delete_many({})
-            result = await collection.insert_one(analysis_data)
+                if existing is None:
+                    # First time: set createdAt
+                    analysis_data['createdAt'] = current_time
+                    action = "created"
+                else:
+                    # Update: preserve original createdAt
+                    analysis_data['createdAt'] = existing.get('createdAt', current_time)
+                    action = "updated"
+
+                # Replace the document in ONE atomic write (never delete-then-insert): if the
+                # retry budget cancels this attempt, the collection still holds an analysis.
+                # The primary's _id is left out, the stored document keeps its own
+                document = {key: value for key, value in analysis_data.items() if key != '_id'}
+                result = await collection.replace_one(
+                    {'_id': existing['_id']} if existing is not None else {},
+                    document,
+                    upsert=True,
+                    bypass_document_validation=True
+                )
+                kept_id = existing['_id'] if existing is not None else result.upserted_id
+
+                # Drop any leftovers so only ONE document with ALL timeframes remains
+                await collection.delete_many({'_id': {'$ne': kept_id}})
 
             direction = analysis_data.get('direction', 'UNKNOWN')
             logger.info(
@@ -105,7 +120,7 @@ class SecondaryMarketAnalysisRepository:
             )
 
             return {
-                'inserted_id': str(result.inserted_id),
+                'inserted_id': str(kept_id),
                 'status': 'success',
                 'action': action
             }
@@ -125,7 +140,7 @@ class SecondaryMarketAnalysisRepository:
             Dictionary with analysis data or None if not found
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             # Build query filter
             query = {}
@@ -152,7 +167,7 @@ class SecondaryMarketAnalysisRepository:
             Number of records
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
             count = await collection.count_documents({})
             return count
 
@@ -1,12 +1,22 @@
 import logging
-from typing import Dict, Any, Optional
-from datetime import datetime
+from typing import Dict, Any, Optional, Union, Iterable, List
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReadPreference
 from config.database import secondary_db_config
-import asyncio
+from repositories._retry import RetryableRepository
 
 logger = logging.getLogger(__name__)
 
-class SecondaryNotificationRepository:
+# Stored timestamps are timezone-aware UTC (BSON dates are UTC)
+_UTC = timezone.utc
+
+# Deletes run in _id batches to bound lock-hold time and oplog bursts per round-trip
+DELETE_BATCH_SIZE = 1000
+
+class SecondaryNotificationRepository(RetryableRepository):
     """
     Repository for Notification operations in SECONDARY database
     Handles CRUD operations for trinity_performance_notifications collection
@@ -15,14 +25,32 @@ class SecondaryNotificationRepository:
 
     def __init__(self):
         self.collection_name = 'trinity_performance_notifications'
-        self.max_retries = 3
-        self.retry_delay = 2  # seconds
 
-    @property
+    @cached_property
     def collection(self):
         """Get the MongoDB collection from secondary database"""
         return secondary_db_config.get_collection(self.collection_name)
 
+    @cached_property
+    def read_collection(self):
+        """Collection handle for pure reads, served by a secondary when available"""
+        return self.collection.with_options(read_preference=ReadPreference.SECONDARY_PREFERRED)
+
+    async def ensure_indexes(self) -> None:
+        """Create indexes for the hot query patterns (idempotent)"""
+        try:
+            collection = self.collection
+
+            # delete_old_notifications: timestamp $lt cutoff
+            await collection.create_index([('timestamp', -1)], background=True)
+            # count_notifications(unread_only=True)
+            await collection.create_index([('read', 1), ('timestamp', -1)], background=True)
+
+            logger.info(f"[SECONDARY DB] Indexes ensured for {self.collection_name}")
+
+        except Exception as e:
+            logger.error(f"[SECONDARY DB] Error creating indexes for {self.collection_name}: {e}")
+
     async def insert_notification_with_retry(self, notification_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Insert notification with retry logic
@@ -33,29 +61,10 @@ class SecondaryNotificationRepository:
         Returns:
             Dictionary with operation result
         """
-        for attempt in range(self.max_retries):
-            try:
-                result = await self._insert_notification(notification_data)
-                if attempt > 0:
-                    logger.info(f"[SECONDARY DB] Successfully saved notification after {attempt + 1} attempts")
-                return result
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    logger.warning(
-                        f"[SECONDARY DB] Attempt {attempt + 1}/{self.max_retries} failed: {e}. "
-                        f"Retrying in {self.retry_delay}s..."
-                    )
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    logger.error(
-                        f"[SECONDARY DB] All {self.max_retries} attempts failed. "
-                        f"Notification NOT saved to secondary database: {e}"
-                    )
-                    return {
-                        'status': 'error',
-                        'message': f'Failed after {self.max_retries} attempts: {str(e)}',
-                        'action': 'failed'
-                    }
+        return await self._with_retry(
+            lambda: self._insert_notification(notification_data),
+            op_name="insert_notification"
+        )
 
     async def _insert_notification(self, notification_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -68,10 +77,10 @@ class SecondaryNotificationRepository:
             Dictionary with operation result
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             # Set timestamps
-            current_time = datetime.now()
+            current_time = datetime.now(_UTC)
             notification_data['createdAt'] = current_time
             notification_data['updatedAt'] = current_time
 
@@ -82,14 +91,14 @@ class SecondaryNotificationRepository:
             # Insert notification
             result = await collection.insert_one(notification_data)
 
-            notification_type = notification_data.get('type', 'unknown')
-            symbol = notification_data.get('symbol', 'N/A')
-
-            logger.info(
-                f"[SECONDARY DB] Notification created: "
-                f"type={notification_type}, symbol={symbol} "
-                f"-> trinity_performance_notifications"
-            )
+            # Per-document log: DEBUG only, and skip building the args when disabled
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "[SECONDARY DB] Notification created: type=%s, symbol=%s "
+                    "-> trinity_performance_notifications",
+                    notification_data.get('type', 'unknown'),
+                    notification_data.get('symbol', 'N/A')
+                )
 
             return {
                 'inserted_id': str(result.inserted_id),
@@ -101,62 +110,44 @@ class SecondaryNotificationRepository:
             logger.error(f"[SECONDARY DB] Error inserting notification: {e}")
             raise
 
-    async def mark_as_read_with_retry(self, notification_id: str) -> Dict[str, Any]:
+    async def mark_as_read_with_retry(self, notification_id: Union[str, ObjectId]) -> Dict[str, Any]:
         """
         Mark notification as read with retry logic
 
         Args:
-            notification_id: ID of the notification
+            notification_id: ID of the notification (string or ObjectId)
 
         Returns:
             Dictionary with operation result
         """
-        for attempt in range(self.max_retries):
-            try:
-                result = await self._mark_as_read(notification_id)
-                if attempt > 0:
-                    logger.info(f"[SECONDARY DB] Successfully marked as read after {attempt + 1} attempts")
-                return result
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    logger.warning(
-                        f"[SECONDARY DB] Attempt {attempt + 1}/{self.max_retries} failed: {e}. "
-                        f"Retrying in {self.retry_delay}s..."
-                    )
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    logger.error(
-                        f"[SECONDARY DB] All {self.max_retries} attempts failed. "
-                        f"Notification NOT marked as read in secondary database: {e}"
-                    )
-                    return {
-                        'status': 'error',
-                        'message': f'Failed after {self.max_retries} attempts: {str(e)}',
-                        'action': 'failed'
-                    }
-
-    async def _mark_as_read(self, notification_id: str) -> Dict[str, Any]:
+        return await self._with_retry(
+            lambda: self._mark_as_read(notification_id),
+            op_name="mark_as_read"
+        )
+
+    async def _mark_as_read(self, notification_id: Union[str, ObjectId]) -> Dict[str, Any]:
         """
         Internal method to mark notification as read
 
         Args:
-            notification_id: ID of the notification
+            notification_id: ID of the notification (string or ObjectId)
 
         Returns:
             Dictionary with operation result
         """
         try:
-            from bson import ObjectId
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
+            oid = notification_id if isinstance(notification_id, ObjectId) else ObjectId(notification_id)
 
             result = await collection.update_one(
-                {'_id': ObjectId(notification_id)},
-                {'$set': {'read': True, 'updatedAt': datetime.now()}}
+                {'_id': oid},
+                {'$set': {'read': True}, '$currentDate': {'updatedAt': True}}
             )
 
-            logger.info(
-                f"[SECONDARY DB] Notification marked as read: {notification_id} "
-                f"-> trinity_performance_notifications"
+            logger.debug(
+                "[SECONDARY DB] Notification marked as read: %s "
+                "-> trinity_performance_notifications",
+                notification_id
             )
 
             return {
@@ -169,6 +160,75 @@ class SecondaryNotificationRepository:
             logger.error(f"[SECONDARY DB] Error marking notification as read: {e}")
             raise
 
+    async def mark_many_as_read_with_retry(self, notification_ids: Iterable[Union[str, ObjectId]]) -> Dict[str, Any]:
+        """
+        Mark several notifications as read in a single update, with retry logic
+
+        Args:
+            notification_ids: IDs of the notifications (strings or ObjectIds)
+
+        Returns:
+            Dictionary with operation result
+        """
+        # Convert once up-front: a malformed id would fail the same way on every retry
+        try:
+            oids = [i if isinstance(i, ObjectId) else ObjectId(i) for i in notification_ids]
+        except (InvalidId, TypeError) as e:
+            logger.error(f"[SECONDARY DB] Notifications NOT marked as read: {e}")
+            return {
+                'status': 'error',
+                'message': str(e),
+                'action': 'failed'
+            }
+
+        if not oids:
+            return {
+                'status': 'success',
+                'action': 'no_data',
+                'modified_count': 0
+            }
+
+        return await self._with_retry(
+            lambda: self._mark_many_as_read(oids),
+            op_name="mark_many_as_read"
+        )
+
+    async def _mark_many_as_read(self, oids: List[ObjectId]) -> Dict[str, Any]:
+        """
+        Internal method to mark several notifications as read
+
+        Args:
+            oids: ObjectIds of the notifications
+
+        Returns:
+            Dictionary with operation result
+        """
+        try:
+            collection = self.collection
+
+            # Mirrored notifications keep the primary's _id, which the primary repository
+            # hands over as a string: match both representations
+            result = await collection.update_many(
+                {'_id': {'$in': oids + [str(oid) for oid in oids]}},
+                {'$set': {'read': True}, '$currentDate': {'updatedAt': True}}
+            )
+
+            logger.info(
+                "[SECONDARY DB] %d notifications marked as read "
+                "-> trinity_performance_notifications",
+                result.modified_count
+            )
+
+            return {
+                'status': 'success',
+                'action': 'updated',
+                'modified_count': result.modified_count
+            }
+
+        except Exception as e:
+            logger.error(f"[SECONDARY DB] Error marking notifications as read: {e}")
+            raise
+
     async def delete_old_notifications_with_retry(self, days: int) -> Dict[str, Any]:
         """
         Delete old notifications with retry logic
@@ -179,29 +239,10 @@ class SecondaryNotificationRepository:
         Returns:
             Dictionary with operation result
         """
-        for attempt in range(self.max_retries):
-            try:
-                result = await self._delete_old_notifications(days)
-                if attempt > 0:
-                    logger.info(f"[SECONDARY DB] Successfully deleted old notifications after {attempt + 1} attempts")
-                return result
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    logger.warning(
-                        f"[SECONDARY DB] Attempt {attempt + 1}/{self.max_retries} failed: {e}. "
-                        f"Retrying in {self.retry_delay}s..."
-                    )
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    logger.error(
-                        f"[SECONDARY DB] All {self.max_retries} attempts failed. "
-                        f"Old notifications NOT deleted from secondary database: {e}"
-                    )
-                    return {
-                        'status': 'error',
-                        'message': f'Failed after {self.max_retries} attempts: {str(e)}',
-                        'action': 'failed'
-                    }
+        return await self._with_retry(
+            lambda: self._delete_old_notifications(days),
+            op_name="delete_old_notifications"
+        )
 
     async def _delete_old_notifications(self, days: int) -> Dict[str, Any]:
         """
@@ -214,24 +255,33 @@ class SecondaryNotificationRepository:
             Dictionary with operation result
         """
         try:
-            from datetime import timedelta
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
+
+            cutoff_date = datetime.now(_UTC) - timedelta(days=days)
 
-            cutoff_date = datetime.now() - timedelta(days=days)
+            deleted_count = 0
+            while True:
+                cursor = collection.find(
+                    {'timestamp': {'$lt': cutoff_date}},
+                    {'_id': 1}
+                ).limit(DELETE_BATCH_SIZE).batch_size(DELETE_BATCH_SIZE)
+                ids = [doc['_id'] async for doc in cursor]
+                if not ids:
+                    break
 
-            result = await collection.delete_many({
-                'timestamp': {'$lt': cutoff_date}
-            })
+                result = await collection.delete_many({'_id': {'$in': ids}})
+                deleted_count += result.deleted_count
 
             logger.info(
-                f"[SECONDARY DB] Deleted {result.deleted_count} notifications older than {days} days "
-                f"-> trinity_performance_notifications"
+                "[SECONDARY DB] Deleted %d notifications older than %d days "
+                "-> trinity_performance_notifications",
+                deleted_count, days
             )
 
             return {
                 'status': 'success',
                 'action': 'deleted',
-                'deleted_count': result.deleted_count,
+                'deleted_count': deleted_count,
                 'days': days
             }
 
@@ -239,20 +289,26 @@ class SecondaryNotificationRepository:
             logger.error(f"[SECONDARY DB] Error deleting old notifications: {e}")
             raise
 
-    async def count_notifications(self, unread_only: bool = False) -> int:
+    async def count_notifications(self, unread_only: bool = False, exact: bool = False) -> int:
         """
         Count notifications in secondary database
 
         Args:
             unread_only: Count only unread notifications
+            exact: Use an exact count for the total instead of collection metadata
 
         Returns:
             Number of notifications
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
-            query = {'read': False} if unread_only else {}
-            count = await collection.count_documents(query)
+            collection = self.read_collection
+            if unread_only:
+                count = await collection.count_documents({'read': False})
+            elif exact:
+                count = await collection.count_documents({})
+            else:
+                # O(1) read of collection metadata instead of a full scan
+                count = await collection.estimated_document_count()
             return count
 
         except Exception as e:
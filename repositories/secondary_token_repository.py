@@ -1,27 +1,60 @@
 import logging
+import asyncio
 from typing import Dict, Any, Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import cached_property
+from pymongo import UpdateOne, WriteConcern, ReadPreference
 from config.database import secondary_db_config
-import asyncio
+from repositories._retry import RetryableRepository
 
 logger = logging.getLogger(__name__)
 
-class SecondaryTokenRepository:
+# Stored timestamps are timezone-aware UTC (BSON dates are UTC)
+_UTC = timezone.utc
+
+# Fields kept out of $set: identity/creation fields plus the server-stamped lastUpdated
+_CREATE_ONLY_FIELDS = frozenset(('_id', 'cmcId', 'createdAt', 'lastUpdated'))
+
+# Bulk upserts are split into chunks of this many ops and written concurrently
+BULK_CHUNK = 500
+
+class SecondaryTokenRepository(RetryableRepository):
     """
     Repository for Token operations in SECONDARY database
     Handles CRUD operations for trinity_performance_tokens collection
     This is a replica/backup of the main token data
+    Writes bypass document validation: the data is mirrored from the primary
     """
 
     def __init__(self):
         self.collection_name = 'trinity_performance_tokens'
-        self.max_retries = 3
-        self.retry_delay = 2  # seconds
+        # The primary is authoritative: skip majority acks and the journal fsync
+        self.write_concern = WriteConcern(w=1, j=False)
 
-    @property
+    @cached_property
     def collection(self):
-        """Get the MongoDB collection from secondary database"""
-        return secondary_db_config.get_collection(self.collection_name)
+        """Get the MongoDB collection from secondary database (backup write concern)"""
+        return secondary_db_config.get_collection(self.collection_name).with_options(
+            write_concern=self.write_concern
+        )
+
+    @cached_property
+    def read_collection(self):
+        """Collection handle for pure reads, served by a secondary when available"""
+        return self.collection.with_options(read_preference=ReadPreference.SECONDARY_PREFERRED)
+
+    async def ensure_indexes(self) -> None:
+        """Create indexes for the hot query patterns (idempotent)"""
+        try:
+            collection = self.collection
+
+            # bulk_upsert_tokens matches on cmcId
+            await collection.create_index([('cmcId', 1)], unique=True, background=True)
+
+            logger.info(f"[SECONDARY DB] Indexes ensured for {self.collection_name}")
+
+        except Exception as e:
+            logger.error(f"[SECONDARY DB] Error creating indexes for {self.collection_name}: {e}")
 
     async def bulk_upsert_tokens_with_retry(self, tokens_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -33,29 +66,10 @@ class SecondaryTokenRepository:
         Returns:
             Dictionary with operation result
         """
-        for attempt in range(self.max_retries):
-            try:
-                result = await self._bulk_upsert_tokens(tokens_data)
-                if attempt > 0:
-                    logger.info(f"[SECONDARY DB] Successfully saved tokens after {attempt + 1} attempts")
-                return result
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    logger.warning(
-                        f"[SECONDARY DB] Attempt {attempt + 1}/{self.max_retries} failed: {e}. "
-                        f"Retrying in {self.retry_delay}s..."
-                    )
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    logger.error(
-                        f"[SECONDARY DB] All {self.max_retries} attempts failed. "
-                        f"Tokens NOT saved to secondary database: {e}"
-                    )
-                    return {
-                        'status': 'error',
-                        'message': f'Failed after {self.max_retries} attempts: {str(e)}',
-                        'action': 'failed'
-                    }
+        return await self._with_retry(
+            lambda: self._bulk_upsert_tokens(tokens_data),
+            op_name="bulk_upsert_tokens"
+        )
 
     async def _bulk_upsert_tokens(self, tokens_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -68,7 +82,7 @@ class SecondaryTokenRepository:
             Dictionary with operation result
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
 
             if not tokens_data:
                 return {
@@ -79,38 +93,48 @@ class SecondaryTokenRepository:
                 }
 
             # Prepare bulk operations
-            from pymongo import UpdateOne
             operations = []
-            current_time = datetime.now()
+            current_time = datetime.now(_UTC)
 
             for token in tokens_data:
-                # Add/update timestamps
-                token['lastUpdated'] = current_time
-                if 'createdAt' not in token:
-                    token['createdAt'] = current_time
+                cmc_id = token['cmcId']
+                # Only volatile fields go in $set; lastUpdated is stamped server-side
+                set_fields = {k: v for k, v in token.items() if k not in _CREATE_ONLY_FIELDS}
+                # Immutable fields are only written when the token is created
+                set_on_insert = {'cmcId': cmc_id, 'createdAt': token.get('createdAt', current_time)}
 
                 operations.append(
                     UpdateOne(
-                        {'cmcId': token['cmcId']},
-                        {'$set': token},
+                        {'cmcId': cmc_id},
+                        {
+                            '$set': set_fields,
+                            '$currentDate': {'lastUpdated': True},
+                            '$setOnInsert': set_on_insert
+                        },
                         upsert=True
                     )
                 )
 
-            # Execute bulk write
-            result = await collection.bulk_write(operations, ordered=False)
+            # Execute unordered chunks concurrently (independent upserts)
+            chunks = [operations[i:i + BULK_CHUNK] for i in range(0, len(operations), BULK_CHUNK)]
+            results = await asyncio.gather(
+                *(collection.bulk_write(chunk, ordered=False, bypass_document_validation=True)
+                  for chunk in chunks)
+            )
+            upserted = sum(r.upserted_count for r in results)
+            modified = sum(r.modified_count for r in results)
 
             logger.info(
-                f"[SECONDARY DB] Tokens synced: "
-                f"upserted={result.upserted_count}, modified={result.modified_count} "
-                f"-> trinity_performance_tokens"
+                "[SECONDARY DB] Tokens synced: upserted=%d, modified=%d "
+                "-> trinity_performance_tokens",
+                upserted, modified
             )
 
             return {
                 'status': 'success',
                 'action': 'upserted',
-                'upserted': result.upserted_count,
-                'modified': result.modified_count,
+                'upserted': upserted,
+                'modified': modified,
                 'total': len(tokens_data)
             }
 
@@ -125,29 +149,10 @@ class SecondaryTokenRepository:
         Returns:
             Dictionary with operation result
         """
-        for attempt in range(self.max_retries):
-            try:
-                result = await self._delete_all_tokens()
-                if attempt > 0:
-                    logger.info(f"[SECONDARY DB] Successfully deleted tokens after {attempt + 1} attempts")
-                return result
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    logger.warning(
-                        f"[SECONDARY DB] Attempt {attempt + 1}/{self.max_retries} failed: {e}. "
-                        f"Retrying in {self.retry_delay}s..."
-                    )
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    logger.error(
-                        f"[SECONDARY DB] All {self.max_retries} attempts failed. "
-                        f"Tokens NOT deleted from secondary database: {e}"
-                    )
-                    return {
-                        'status': 'error',
-                        'message': f'Failed after {self.max_retries} attempts: {str(e)}',
-                        'action': 'failed'
-                    }
+        return await self._with_retry(
+            lambda: self._delete_all_tokens(),
+            op_name="delete_all_tokens"
+        )
 
     async def _delete_all_tokens(self) -> Dict[str, Any]:
         """
@@ -157,34 +162,43 @@ class SecondaryTokenRepository:
             Dictionary with operation result
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
+            collection = self.collection
+
             result = await collection.delete_many({})
+            deleted_count = result.deleted_count
 
             logger.info(
-                f"[SECONDARY DB] Deleted {result.deleted_count} tokens "
-                f"-> trinity_performance_tokens"
+                "[SECONDARY DB] Deleted %d tokens -> trinity_performance_tokens",
+                deleted_count
             )
 
             return {
                 'status': 'success',
                 'action': 'deleted',
-                'deleted_count': result.deleted_count
+                'deleted_count': deleted_count
             }
 
         except Exception as e:
             logger.error(f"[SECONDARY DB] Error deleting tokens: {e}")
             raise
 
-    async def count_tokens(self) -> int:
+    async def count_tokens(self, exact: bool = False) -> int:
         """
         Count total tokens in secondary database
 
+        Args:
+            exact: Use an exact count instead of collection metadata
+
         Returns:
             Number of tokens
         """
         try:
-            collection = secondary_db_config.get_collection(self.collection_name)
-            count = await collection.count_documents({})
+            collection = self.read_collection
+            if exact:
+                count = await collection.count_documents({})
+            else:
+                # O(1) read of collection metadata instead of a full scan
+                count = await collection.estimated_document_count()
             return count
 
         except Exception as e:
@@ -1,15 +1,44 @@
 # ==========================
 # Token Repository
 # ==========================
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from typing import List, Optional, Dict, Any, AsyncIterator
+from datetime import datetime, timedelta, timezone
 import logging
-from pymongo import UpdateOne
+from pymongo import UpdateOne, ReadPreference
+from pymongo.errors import BulkWriteError, OperationFailure
 from models.token_model import TokenModel
+from functools import cached_property
 from config.database import db_config
 
 logger = logging.getLogger(__name__)
 
+# Stored timestamps are timezone-aware UTC (BSON dates are UTC)
+_UTC = timezone.utc
+
+# Fields most callers need; pass projection=None to fetch full documents
+DEFAULT_TOKEN_PROJECTION = {
+    "symbol": 1,
+    "name": 1,
+    "cmcId": 1,
+    "marketCap": 1,
+    "isOnOKX": 1,
+    "cmcRank": 1,
+    "_id": 0
+}
+
+# Keys a token needs before it can be upserted
+_REQUIRED_TOKEN_FIELDS = frozenset(("symbol", "name", "cmcId", "marketCap"))
+
+# find_by_market_cap condition -> query operator
+_MCAP_OPS = {
+    "greater": "$gte",
+    "less": "$lte",
+    "equal": "$eq"
+}
+
+# Documents per getMore round-trip: balances RTT against peak memory
+CURSOR_BATCH_SIZE = 200
+
 class TokenRepository:
     """
     Repository pattern for token data access
@@ -19,33 +48,91 @@ class TokenRepository:
     def __init__(self):
         self.collection_name = "trinity_market_cap_tokens"
 
+    @cached_property
+    def collection(self):
+        """Get the MongoDB collection"""
+        return db_config.get_collection(self.collection_name)
+
+    @cached_property
+    def read_collection(self):
+        """Collection handle for pure reads, served by a secondary when available"""
+        return self.collection.with_options(read_preference=ReadPreference.SECONDARY_PREFERRED)
+
+    async def ensure_indexes(self) -> None:
+        """
+        Create indexes for the hot query patterns (idempotent)
+        Raises if the unique cmcId index cannot be built: upsert_many relies on it
+        """
+        collection = self.collection
+
+        # upsert_many key: without a unique cmcId index a refresh may duplicate tokens
+        try:
+            await collection.create_index([("cmcId", 1)], unique=True, background=True)
+        except OperationFailure as e:
+            logger.error(
+                f"Unique cmcId index missing on {self.collection_name} "
+                f"(run scripts/migrate_token_indexes.py): {e}"
+            )
+            raise
+
+        try:
+            # find_by_market_cap: filter + sort on marketCap, optional isOnOKX filter
+            await collection.create_index([("marketCap", -1), ("isOnOKX", 1)], background=True)
+            # find_by_symbol lookups; CoinMarketCap tickers are not unique, so neither is this index
+            await collection.create_index([("symbol", 1)], background=True)
+            # delete_old_tokens: lastUpdated $lt cutoff
+            await collection.create_index([("lastUpdated", 1)], background=True)
+
+            logger.info(f"Indexes ensured for {self.collection_name}")
+
+        except Exception as e:
+            logger.error(f"Error creating indexes for {self.collection_name}: {e}")
+
+    async def iter_by_market_cap(
+        self,
+        min_market_cap: float,
+        is_on_okx: Optional[bool] = None,
+        limit: int = 100,
+        condition: str = 'greater',
+        projection: Optional[Dict[str, int]] = DEFAULT_TOKEN_PROJECTION
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream tokens by market cap with condition (greater, less, equal)"""
+        collection = self.read_collection
+
+        # Build market cap filter based on condition (unknown conditions default to greater)
+        op = _MCAP_OPS.get(condition, "$gte")
+        query = {"marketCap": {op: min_market_cap}}
+        if is_on_okx is not None:
+            query["isOnOKX"] = is_on_okx
+
+        cursor = (
+            collection.find(query, projection)
+            .sort("marketCap", -1)
+            .limit(limit)
+            .batch_size(CURSOR_BATCH_SIZE)
+        )
+        async for token in cursor:
+            yield token
+
     async def find_by_market_cap(
         self,
         min_market_cap: float,
         is_on_okx: Optional[bool] = None,
         limit: int = 100,
-        condition: str = 'greater'
+        condition: str = 'greater',
+        projection: Optional[Dict[str, int]] = DEFAULT_TOKEN_PROJECTION
     ) -> List[Dict[str, Any]]:
         """Find tokens by market cap with condition (greater, less, equal)"""
         try:
-            collection = db_config.get_collection(self.collection_name)
-
-            # Build market cap filter based on condition
-            if condition == 'greater':
-                market_cap_filter = {"$gte": min_market_cap}
-            elif condition == 'less':
-                market_cap_filter = {"$lte": min_market_cap}
-            elif condition == 'equal':
-                market_cap_filter = {"$eq": min_market_cap}
-            else:
-                market_cap_filter = {"$gte": min_market_cap}
-
-            query = {"marketCap": market_cap_filter}
-            if is_on_okx is not None:
-                query["isOnOKX"] = is_on_okx
-
-            cursor = collection.find(query).sort("marketCap", -1).limit(limit)
-            tokens = await cursor.to_list(length=limit)
+            tokens = [
+                token async for token in self.iter_by_market_cap(
+                    min_market_cap,
+                    is_on_okx=is_on_okx,
+                    limit=limit,
+                    condition=condition,
+                    projection=projection
+                )
+            ]
 
             logger.info(f"Found {len(tokens)} tokens with market cap {condition} ${min_market_cap:,}")
 
@@ -58,7 +145,7 @@ class TokenRepository:
     async def find_by_symbol(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Find token by symbol"""
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.read_collection
             token = await collection.find_one({"symbol": symbol.upper()})
             return token
 
@@ -66,11 +153,36 @@ class TokenRepository:
             logger.error(f"Error finding token by symbol: {e}")
             raise
 
-    async def find_all(self, limit: int = 1000) -> List[Dict[str, Any]]:
+    async def find_by_symbols(
+        self,
+        symbols: List[str],
+        projection: Optional[Dict[str, int]] = DEFAULT_TOKEN_PROJECTION
+    ) -> List[Dict[str, Any]]:
+        """Find tokens for many symbols in a single query"""
+        try:
+            collection = self.read_collection
+            upper = [symbol.upper() for symbol in symbols]
+            cursor = collection.find({"symbol": {"$in": upper}}, projection)
+            return await cursor.to_list(length=len(upper))
+
+        except Exception as e:
+            logger.error(f"Error finding tokens by symbols: {e}")
+            raise
+
+    async def find_all(
+        self,
+        limit: int = 1000,
+        projection: Optional[Dict[str, int]] = DEFAULT_TOKEN_PROJECTION
+    ) -> List[Dict[str, Any]]:
         """Find all tokens"""
         try:
-            collection = db_config.get_collection(self.collection_name)
-            cursor = collection.find().sort("marketCap", -1).limit(limit)
+            collection = self.read_collection
+            cursor = (
+                collection.find({}, projection)
+                .sort("marketCap", -1)
+                .limit(limit)
+                .batch_size(CURSOR_BATCH_SIZE)
+            )
             tokens = await cursor.to_list(length=limit)
             logger.info(f"Found {len(tokens)} total tokens")
             return tokens
@@ -80,50 +192,68 @@ class TokenRepository:
             raise
 
     async def upsert_many(self, tokens: List[Dict[str, Any]]) -> Dict[str, int]:
-        """Insert or update multiple tokens"""
+        """
+        Insert or update multiple tokens
+        Matches on cmcId only (unique index); legacy documents without a cmcId are
+        reconciled once by scripts/migrate_token_indexes.py
+        """
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
             operations = []
+            append = operations.append
+            update_one = UpdateOne
+            now = datetime.now(_UTC)
 
             for token in tokens:
-                if not all(k in token for k in ["symbol", "name", "cmcId", "marketCap"]):
+                if not _REQUIRED_TOKEN_FIELDS.issubset(token):
                     logger.warning(f"Skipping incomplete token: {token}")
                     continue
 
-                operation = UpdateOne(
-                    {
-                        "$or": [
-                            {"cmcId": token["cmcId"]},
-                            {"symbol": token["symbol"].upper()}
-                        ]
-                    },
+                cmc_id = token["cmcId"]
+                exchanges = token.get("exchanges") or []
+
+                # Match on cmcId only (stable CoinMarketCap id) so each op is a single index seek
+                append(update_one(
+                    {"cmcId": cmc_id},
                     {
                         "$set": {
                             "symbol": token["symbol"].upper(),
                             "name": token["name"],
-                            "cmcId": token["cmcId"],
                             "marketCap": token["marketCap"],
                             "price": token.get("price"),
                             "cmcRank": token.get("cmcRank"),
-                            "exchanges": token.get("exchanges", []),
+                            "exchanges": exchanges,
                             "isOnOKX": token.get("isOnOKX", False),
-                            "exchangeCount": len(token.get("exchanges", [])),
-                            "lastUpdated": datetime.now()
+                            "exchangeCount": len(exchanges)
+                        },
+                        # Stamped server-side, consistent across app instances
+                        "$currentDate": {"lastUpdated": True},
+                        # Immutable fields are only written when the token is created
+                        "$setOnInsert": {
+                            "cmcId": cmc_id,
+                            "createdAt": now
                         }
                     },
                     upsert=True
-                )
-                operations.append(operation)
+                ))
 
             if not operations:
                 return {"inserted": 0, "modified": 0, "matched": 0}
 
-            result = await collection.bulk_write(operations)
+            try:
+                result = await collection.bulk_write(operations, ordered=False)
+                counts = (result.upserted_count, result.modified_count, result.matched_count)
+            except BulkWriteError as bwe:
+                # Unordered: the other ops were applied, don't fail the whole refresh for a few
+                details = bwe.details
+                for error in details.get("writeErrors", []):
+                    logger.error(f"Token upsert failed (op {error.get('index')}): {error.get('errmsg')}")
+                counts = (details.get("nUpserted", 0), details.get("nModified", 0), details.get("nMatched", 0))
 
             return {
-                "inserted": result.upserted_count,
-                "modified": result.modified_count,
-                "matched": result.matched_count
+                "inserted": counts[0],
+                "modified": counts[1],
+                "matched": counts[2]
             }
 
         except Exception as e:
@@ -133,9 +263,9 @@ class TokenRepository:
     async def delete_old_tokens(self, days: int = 30) -> int:
         """Delete tokens not updated in specified days"""
         try:
-            collection = db_config.get_collection(self.collection_name)
+            collection = self.collection
 
-            cutoff_date = datetime.now() - timedelta(days=days)
+            cutoff_date = datetime.now(_UTC) - timedelta(days=days)
             result = await collection.delete_many({"lastUpdated": {"$lt": cutoff_date}})
 
             return result.deleted_count
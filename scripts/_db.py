@@ -0,0 +1,74 @@
+"""
+Shared MongoDB client for the maintenance scripts
+One client per connection string per process, so scripts run together reuse the
+same TLS handshake, SRV lookup and topology discovery
+"""
+
+import os
+from functools import lru_cache
+from importlib.util import find_spec
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+def _available_compressors() -> str:
+    """Wire compressors to negotiate, skipping those whose library isn't installed"""
+    compressors = []
+    if find_spec('zstandard') is not None:
+        compressors.append('zstd')
+    if find_spec('snappy') is not None:
+        compressors.append('snappy')
+    compressors.append('zlib')  # stdlib, always available
+    return ','.join(compressors)
+
+@lru_cache(maxsize=None)
+def get_client(uri_env: str = 'SECONDARY_MONGODB_URI') -> AsyncIOMotorClient:
+    """
+    Get the shared client for the connection string in the given env variable
+
+    Args:
+        uri_env: Name of the environment variable holding the MongoDB URI
+
+    Returns:
+        Cached AsyncIOMotorClient
+    """
+    return AsyncIOMotorClient(
+        os.getenv(uri_env),
+        maxPoolSize=10,
+        serverSelectionTimeoutMS=5000,
+        compressors=_available_compressors()
+    )
+
+@lru_cache(maxsize=None)
+def get_sync_client(uri_env: str = 'SECONDARY_MONGODB_URI') -> MongoClient:
+    """
+    Get the shared synchronous client for scripts that make no concurrent calls
+
+    Args:
+        uri_env: Name of the environment variable holding the MongoDB URI
+
+    Returns:
+        Cached MongoClient
+    """
+    return MongoClient(
+        os.getenv(uri_env),
+        maxPoolSize=10,
+        serverSelectionTimeoutMS=5000,
+        compressors=_available_compressors()
+    )
+
+def describe_scan(plan: dict) -> str:
+    """
+    Summarize an explain() result: documents vs index keys examined
+
+    Args:
+        plan: explain() output (executionStats or allPlansExecution verbosity)
+
+    Returns:
+        One-line summary; docs examined == keys examined means an index scan
+    """
+    stats = plan.get('executionStats', {})
+    docs = stats.get('totalDocsExamined', 0)
+    keys = stats.get('totalKeysExamined', 0)
+    scan = "IXSCAN" if keys and docs <= keys else "COLLSCAN"
+    return f"{scan}: totalDocsExamined={docs}, totalKeysExamined={keys}"
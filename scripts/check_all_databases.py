@@ -4,6 +4,7 @@ Identifies which databases are using space
 """
 
 import asyncio
+import heapq
 import sys
 from pathlib import Path
 
@@ -18,6 +19,9 @@ import os
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(env_path)
 
+# Only the largest databases get a dbStats call (for their collection count)
+TOP_N_DATABASES = 10
+
 async def check_all_databases():
     """Check all databases in the cluster"""
 
@@ -31,42 +35,58 @@ async def check_all_databases():
 
         print(f"\nConnecting to cluster: {uri}\n")
 
-        # Create client
-        client = AsyncIOMotorClient(uri)
+        # Create client (small pool: this is a one-shot admin tool)
+        client = AsyncIOMotorClient(
+            uri,
+            maxPoolSize=16,
+            minPoolSize=1,
+            serverSelectionTimeoutMS=5000,
+            appname="check_all_databases"
+        )
+
+    except Exception as e:
+        print(f"\nError connecting to cluster: {e}")
+        return
 
-        # List all databases
-        db_list = await client.list_database_names()
+    try:
+        # List all databases with their on-disk size in a single round-trip
+        result = await client.admin.command({"listDatabases": 1})
+        databases = result.get('databases', [])
 
-        print(f"Total databases in cluster: {len(db_list)}\n")
+        print(f"Total databases in cluster: {len(databases)}\n")
 
         print("DATABASE DETAILS")
         print("-" * 80)
         print(f"{'Database Name':<30} {'Collections':>12} {'Size (MB)':>15}")
         print("-" * 80)
 
-        total_size = 0
-        db_details = []
-
-        for db_name in sorted(db_list):
-            try:
-                db = client[db_name]
-                stats = await db.command("dbStats")
-
-                size_mb = (stats.get('dataSize', 0) + stats.get('indexSize', 0)) / (1024 * 1024)
-                collections = stats.get('collections', 0)
-
-                total_size += size_mb
-
-                db_details.append({
-                    'name': db_name,
-                    'size': size_mb,
-                    'collections': collections
-                })
-
-                print(f"{db_name:<30} {collections:>12} {size_mb:>14.2f} MB")
-
-            except Exception as e:
-                print(f"{db_name:<30} {'ERROR':>12} {str(e)}")
+        db_details = [
+            {
+                'name': db['name'],
+                'size': db.get('sizeOnDisk', 0) / (1024 * 1024),
+                'collections': None
+            }
+            for db in databases
+        ]
+        total_size = sum(db['size'] for db in db_details)
+
+        # Collection counts need dbStats: fetch them concurrently for the largest databases only
+        largest = heapq.nlargest(TOP_N_DATABASES, db_details, key=lambda x: x['size'])
+
+        results = await asyncio.gather(
+            *(client[db['name']].command("dbStats") for db in largest),
+            return_exceptions=True
+        )
+
+        for db, stats in zip(largest, results):
+            if isinstance(stats, Exception):
+                print(f"  dbStats failed for {db['name']}: {stats}")
+                continue
+            db['collections'] = stats.get('collections', 0)
+
+        for db in sorted(db_details, key=lambda x: x['name']):
+            collections = db['collections'] if db['collections'] is not None else '-'
+            print(f"{db['name']:<30} {collections:>12} {db['size']:>14.2f} MB")
 
         print("-" * 80)
         print(f"{'TOTAL CLUSTER SIZE':<30} {'':<12} {total_size:>14.2f} MB")
@@ -77,9 +97,8 @@ async def check_all_databases():
         # Show largest databases
         print("\nLARGEST DATABASES")
         print("-" * 80)
-        db_details.sort(key=lambda x: x['size'], reverse=True)
 
-        for i, db in enumerate(db_details[:10], 1):
+        for i, db in enumerate(largest, 1):
             percentage = (db['size'] / total_size * 100) if total_size > 0 else 0
             print(f"{i}. {db['name']:<28} {db['size']:>8.2f} MB ({percentage:>5.1f}%)")
 
@@ -107,12 +126,15 @@ async def check_all_databases():
 
         print("\n" + "=" * 80)
 
-        client.close()
-
     except Exception as e:
         print(f"\nError checking cluster: {e}")
         import traceback
         traceback.print_exc()
 
+    finally:
+        client.close()
+        # close() schedules shutdown; yield once so it runs before the loop exits
+        await asyncio.sleep(0)
+
 if __name__ == "__main__":
     asyncio.run(check_all_databases())
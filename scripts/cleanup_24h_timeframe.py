@@ -3,14 +3,14 @@ Script to delete all candlesticks with timeframe '24h' from the database
 We only want to keep '1d' which is calculated using our Rolling Period method
 """
 
-import asyncio
+import argparse
 import sys
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from scripts._db import get_sync_client, describe_scan
 from dotenv import load_dotenv
 import os
 
@@ -18,8 +18,13 @@ import os
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(env_path)
 
-async def cleanup_24h_timeframe():
-    """Delete all candlesticks with timeframe '24h'"""
+def cleanup_24h_timeframe(dry_run: bool = False):
+    """
+    Delete all candlesticks with timeframe '24h'
+
+    Args:
+        dry_run: Only count and explain the delete filter, without deleting
+    """
 
     print("=" * 80)
     print("CLEANUP: Removing '24h' timeframe from database")
@@ -28,25 +33,31 @@ async def cleanup_24h_timeframe():
     try:
         # Get database
         db_name = os.getenv('DB_NAME', 'trinity_market')
-        uri = os.getenv('MONGODB_URI')
 
         print(f"\nConnecting to PRIMARY database: {db_name}")
 
-        # Create client
-        client = AsyncIOMotorClient(uri)
+        # Shared client (reused across scripts in the same process)
+        client = get_sync_client('MONGODB_URI')
         db = client[db_name]
         collection = db['trinity_candlesticks']
 
+        # The timeframe filters below use the (timeframe, performance) index that
+        # CandleRepository.ensure_indexes creates (timeframe is its prefix)
         # Count how many '24h' candlesticks exist
-        count_24h = await collection.count_documents({'timeframe': '24h'})
+        count_24h = collection.count_documents({'timeframe': '24h'})
         print(f"\nFound {count_24h} candlesticks with timeframe '24h'")
 
         if count_24h == 0:
             print("\nNo '24h' candlesticks to delete. Database is clean!")
+        elif dry_run:
+            # Preview only: show how the delete filter would be executed
+            plan = collection.find({'timeframe': '24h'}).explain()
+            print(f"\n[DRY RUN] Would delete {count_24h} '24h' candlesticks")
+            print(f"[DRY RUN] {describe_scan(plan)}")
         else:
             # Delete all '24h' candlesticks
             print(f"\nDeleting {count_24h} '24h' candlesticks...")
-            result = await collection.delete_many({'timeframe': '24h'})
+            result = collection.delete_many({'timeframe': '24h'})
             print(f"✓ Deleted {result.deleted_count} candlesticks with timeframe '24h'")
 
         # Show remaining timeframes
@@ -54,21 +65,26 @@ async def cleanup_24h_timeframe():
         print("REMAINING TIMEFRAMES IN DATABASE:")
         print("-" * 80)
 
-        timeframes = await collection.distinct('timeframe')
-        for tf in sorted(timeframes):
-            count = await collection.count_documents({'timeframe': tf})
-            print(f"  {tf}: {count} candlesticks")
+        # One grouped scan instead of distinct + a count per timeframe
+        pipeline = [
+            {"$group": {"_id": "$timeframe", "n": {"$sum": 1}}},
+            {"$sort": {"_id": 1}}
+        ]
+        for doc in collection.aggregate(pipeline):
+            print(f"  {doc['_id']}: {doc['n']} candlesticks")
 
         print("\n" + "=" * 80)
         print("CLEANUP COMPLETED SUCCESSFULLY!")
         print("=" * 80)
 
-        client.close()
-
     except Exception as e:
         print(f"\nError during cleanup: {e}")
         import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
-    asyncio.run(cleanup_24h_timeframe())
+    parser = argparse.ArgumentParser(description="Delete '24h' candlesticks")
+    parser.add_argument('--dry-run', action='store_true', help="Count and explain only, delete nothing")
+    args = parser.parse_args()
+
+    cleanup_24h_timeframe(dry_run=args.dry_run)
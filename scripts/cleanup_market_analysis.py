@@ -1,22 +1,39 @@
 """
 Script temporal para limpiar registros duplicados o antiguos de Market Analysis
 Ejecutar una vez para resolver el problema de datos obsoletos
+
+Crea un indice TTL sobre 'updatedAt' (7 dias): MongoDB elimina en segundo plano
+los registros que no se han actualizado en 7 dias, sin necesidad de este script.
+Se usa 'updatedAt' y no 'createdAt' porque el documento vigente conserva su
+createdAt original y un TTL sobre ese campo lo borraria aunque siga al dia.
 """
+import argparse
 import asyncio
 import sys
 import os
-from datetime import datetime, timedelta
 
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.database import db_config
 from repositories.market_analysis_repository import MarketAnalysisRepository
+from scripts._db import describe_scan
+
+TIMEFRAMES = ['12h', '24h']
+
+# Only the fields the report prints
+SUMMARY_PROJECTION = {'_id': 1, 'createdAt': 1, 'timestamp': 1, 'market_status': 1}
 
-async def cleanup_market_analysis():
+# Records not updated for this long are purged by the TTL index
+STALE_AFTER_SECONDS = 7 * 24 * 3600
+
+async def cleanup_market_analysis(dry_run: bool = False):
     """
     Limpia la colección de market analysis dejando solo los registros más recientes
     para cada timeframe (12h y 24h)
+
+    Args:
+        dry_run: Solo contar lo que se eliminaria, sin borrar nada ni crear el indice TTL
     """
     print("=" * 70)
     print("MARKET ANALYSIS CLEANUP SCRIPT")
@@ -32,57 +49,96 @@ async def cleanup_market_analysis():
         repo = MarketAnalysisRepository()
         collection = db_config.get_collection('marketAnalysis')
 
+        # Dry-run leaves the database untouched, indexes included
+        if not dry_run:
+            # Index-cover the timeframe filter + createdAt sort used below (idempotent)
+            await collection.create_index([('timeframe', 1), ('createdAt', -1)], background=True)
+
+            # Let the server purge stale records continuously instead of a cutoff delete per run
+            # (a TTL index starts deleting as soon as it exists)
+            await collection.create_index('updatedAt', expireAfterSeconds=STALE_AFTER_SECONDS)
+
         # Count total records before cleanup
         total_before = await collection.count_documents({})
         print(f"\n[STATS] Total records BEFORE cleanup: {total_before}")
 
-        # Get all records grouped by timeframe
+        # Group records by timeframe server-side: keep the most recent one, collect the rest
         print("\n[ANALYZING] Records by timeframe...")
 
-        for timeframe in ['12h', '24h']:
-            print(f"\n  Timeframe: {timeframe}")
-
-            # Count records for this timeframe
-            count = await collection.count_documents({'timeframe': timeframe})
-            print(f"    - Total records: {count}")
-
-            if count > 1:
-                # Get all records for this timeframe, sorted by createdAt
-                cursor = collection.find(
-                    {'timeframe': timeframe},
-                    sort=[('createdAt', -1)]
-                )
-                records = await cursor.to_list(length=None)
-
-                if records:
-                    # Keep the most recent one
-                    latest = records[0]
-                    latest_created = latest.get('createdAt', 'Unknown')
-                    latest_timestamp = latest.get('timestamp', 'Unknown')
-
-                    print(f"    - Latest record:")
-                    print(f"      * createdAt: {latest_created}")
-                    print(f"      * timestamp: {latest_timestamp}")
-                    print(f"      * status: {latest.get('market_status')}")
-
-                    # Delete all older records
-                    ids_to_delete = [r['_id'] for r in records[1:]]
-
-                    if ids_to_delete:
-                        result = await collection.delete_many({
-                            '_id': {'$in': ids_to_delete}
-                        })
-                        print(f"    - Deleted {result.deleted_count} old records")
+        # $max finds the newest createdAt in one pass, no sort of every record needed
+        pipeline = [
+            {"$match": {"timeframe": {"$in": TIMEFRAMES}}},
+            {"$group": {
+                "_id": "$timeframe",
+                "count": {"$sum": 1},
+                "latestCreatedAt": {"$max": "$createdAt"},
+                "docs": {"$push": {
+                    "_id": "$_id",
+                    "createdAt": "$createdAt",
+                    "timestamp": "$timestamp",
+                    "market_status": "$market_status"
+                }}
+            }},
+            # Without any createdAt in the group there is no newest one: keep the first record
+            {"$addFields": {
+                "latest": {"$ifNull": [
+                    {"$arrayElemAt": [
+                        {"$filter": {
+                            "input": "$docs",
+                            "cond": {"$eq": ["$$this.createdAt", "$latestCreatedAt"]}
+                        }},
+                        0
+                    ]},
+                    {"$arrayElemAt": ["$docs", 0]}
+                ]}
+            }},
+            {"$project": {
+                "count": 1,
+                "latest": 1,
+                "drop": {"$map": {
+                    "input": {"$filter": {
+                        "input": "$docs",
+                        "cond": {"$ne": ["$$this._id", "$latest._id"]}
+                    }},
+                    "in": "$$this._id"
+                }}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+
+        ids_to_delete = []
+        async for group in collection.aggregate(pipeline):
+            print(f"\n  Timeframe: {group['_id']}")
+            print(f"    - Total records: {group['count']}")
+
+            if group['drop']:
+                latest = group['latest']
+                print(f"    - Latest record:")
+                print(f"      * createdAt: {latest.get('createdAt', 'Unknown')}")
+                print(f"      * timestamp: {latest.get('timestamp', 'Unknown')}")
+                print(f"      * status: {latest.get('market_status')}")
+                print(f"    - Old records to delete: {len(group['drop'])}")
+                ids_to_delete.extend(group['drop'])
             else:
                 print(f"    - Only 1 record found, no cleanup needed")
 
-        # Also delete any records older than 7 days
-        print("\n[CLEANUP] Deleting records older than 7 days...")
-        cutoff_date = datetime.now() - timedelta(days=7)
-        old_records_result = await collection.delete_many({
-            'createdAt': {'$lt': cutoff_date}
-        })
-        print(f"    - Deleted {old_records_result.deleted_count} old records (>7 days)")
+        # Delete superseded records (stale ones are handled by the TTL index)
+        # All timeframes' ids go in a single delete_many
+        delete_filter = {'_id': {'$in': ids_to_delete}}
+        if dry_run:
+            print("\n[DRY RUN] Counting superseded records (nothing will be deleted)...")
+            would_delete = await collection.count_documents(delete_filter) if ids_to_delete else 0
+            print(f"    - Would delete {would_delete} records")
+            if ids_to_delete:
+                plan = await collection.find(delete_filter).explain()
+                print(f"    - {describe_scan(plan)}")
+        else:
+            print("\n[CLEANUP] Deleting superseded records...")
+            if ids_to_delete:
+                result = await collection.delete_many(delete_filter)
+                print(f"    - Deleted {result.deleted_count} records")
+            else:
+                print(f"    - Nothing to delete")
 
         # Count total records after cleanup
         total_after = await collection.count_documents({})
@@ -91,9 +147,10 @@ async def cleanup_market_analysis():
 
         # Show final state
         print("\n[FINAL STATE] Current records:")
-        for timeframe in ['12h', '24h']:
+        for timeframe in TIMEFRAMES:
             analysis = await collection.find_one(
                 {'timeframe': timeframe},
+                projection=SUMMARY_PROJECTION,
                 sort=[('createdAt', -1)]
             )
             if analysis:
@@ -123,4 +180,8 @@ async def cleanup_market_analysis():
             pass
 
 if __name__ == "__main__":
-    asyncio.run(cleanup_market_analysis())
+    parser = argparse.ArgumentParser(description="Clean up superseded market analysis records")
+    parser.add_argument('--dry-run', action='store_true', help="Count and explain only, delete nothing")
+    args = parser.parse_args()
+
+    asyncio.run(cleanup_market_analysis(dry_run=args.dry_run))
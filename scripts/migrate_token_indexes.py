@@ -0,0 +1,138 @@
+"""
+One-off migration for the token collection (trinity_market_cap_tokens)
+
+TokenRepository.upsert_many matches tokens on cmcId only. Legacy documents
+written without a cmcId are never matched again, so this script reconciles them
+once by removing them: the next token refresh stores every listed token under
+its real cmcId, and several missing cmcIds would also block the unique index.
+
+It then moves the indexes to the layout TokenRepository.ensure_indexes expects
+(the app refuses to start without the unique cmcId index):
+- symbol: non-unique (CoinMarketCap tickers are not unique), replacing an
+  older unique symbol index
+- cmcId: unique, after keeping only the most recently updated duplicate
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts._db import get_sync_client
+from dotenv import load_dotenv
+import os
+
+# Load environment variables
+env_path = Path(__file__).parent.parent / '.env'
+load_dotenv(env_path)
+
+# Documents the CMC refresh wrote before cmcId was required
+MISSING_CMC_ID = {'$or': [{'cmcId': {'$exists': False}}, {'cmcId': None}]}
+
+def reconcile_missing_cmc_ids(collection, dry_run: bool) -> None:
+    """Remove documents without cmcId (upsert_many can never match them again)"""
+    print("\n[1] Documents without cmcId")
+
+    orphans = list(collection.find(MISSING_CMC_ID, {'symbol': 1}))
+    print(f"    - Found {len(orphans)}")
+    if not orphans:
+        return
+
+    symbols = list({doc.get('symbol') for doc in orphans if doc.get('symbol')})
+    superseded_symbols = set(collection.distinct(
+        'symbol',
+        {'symbol': {'$in': symbols}, 'cmcId': {'$ne': None}}
+    ))
+    superseded = sum(1 for doc in orphans if doc.get('symbol') in superseded_symbols)
+    print(f"    - {superseded} already stored under a real cmcId, "
+          f"{len(orphans) - superseded} will be re-added by the next token refresh")
+
+    if dry_run:
+        print(f"    [DRY RUN] Would delete {len(orphans)} documents")
+        return
+
+    # They also block the unique cmcId index (several missing values collide)
+    result = collection.delete_many({'_id': {'$in': [doc['_id'] for doc in orphans]}})
+    print(f"    - Deleted {result.deleted_count} documents")
+
+def make_symbol_index_non_unique(collection, dry_run: bool) -> None:
+    """Replace a unique symbol index with a non-unique one"""
+    print("\n[2] symbol index")
+
+    symbol_index = collection.index_information().get('symbol_1')
+    if symbol_index and symbol_index.get('unique'):
+        if dry_run:
+            print("    [DRY RUN] Would replace the unique symbol_1 index with a non-unique one")
+            return
+        collection.drop_index('symbol_1')
+        print("    - Dropped unique symbol_1")
+
+    if not dry_run:
+        collection.create_index('symbol', background=True)
+    print("    - symbol_1 is non-unique")
+
+def build_unique_cmc_id_index(collection, dry_run: bool) -> None:
+    """Remove duplicate cmcIds (keeping the newest) and build the unique cmcId index"""
+    print("\n[3] Unique cmcId index")
+
+    # Newest first within each duplicated cmcId; everything after the first is dropped
+    pipeline = [
+        {"$match": {"cmcId": {"$ne": None}}},
+        {"$sort": {"lastUpdated": -1}},
+        {"$group": {"_id": "$cmcId", "ids": {"$push": "$_id"}, "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gt": 1}}}
+    ]
+    duplicates = [doc_id for group in collection.aggregate(pipeline) for doc_id in group['ids'][1:]]
+    print(f"    - Duplicate documents: {len(duplicates)}")
+
+    if dry_run:
+        print(f"    [DRY RUN] Would delete {len(duplicates)} duplicates and build cmcId_1 (unique)")
+        return
+
+    if duplicates:
+        result = collection.delete_many({'_id': {'$in': duplicates}})
+        print(f"    - Deleted {result.deleted_count} duplicates")
+
+    collection.create_index('cmcId', unique=True, background=True)
+    print("    - cmcId_1 (unique) ready")
+
+def migrate_token_indexes(dry_run: bool = False):
+    """
+    Reconcile legacy token documents and migrate the token indexes
+
+    Args:
+        dry_run: Only report what would change, without writing
+    """
+    print("=" * 80)
+    print("MIGRATION: trinity_market_cap_tokens")
+    print("=" * 80)
+
+    try:
+        db_name = os.getenv('DB_NAME', 'trinity_market')
+        print(f"\nConnecting to PRIMARY database: {db_name}")
+
+        # Shared client (reused across scripts in the same process)
+        client = get_sync_client('MONGODB_URI')
+        collection = client[db_name]['trinity_market_cap_tokens']
+
+        reconcile_missing_cmc_ids(collection, dry_run)
+        make_symbol_index_non_unique(collection, dry_run)
+        build_unique_cmc_id_index(collection, dry_run)
+
+        print("\n" + "=" * 80)
+        print("MIGRATION COMPLETED SUCCESSFULLY!")
+        print("=" * 80)
+
+    except Exception as e:
+        print(f"\nError during migration: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile legacy token documents and migrate token indexes")
+    parser.add_argument('--dry-run', action='store_true', help="Report only, write nothing")
+    args = parser.parse_args()
+
+    migrate_token_indexes(dry_run=args.dry_run)
@@ -2,15 +2,15 @@
 Test script to manually save data to secondary database
 """
 
-import asyncio
 import sys
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from bson import encode
+from scripts._db import get_sync_client
 from dotenv import load_dotenv
 import os
 
@@ -18,7 +18,7 @@ import os
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(env_path)
 
-async def test_save():
+def test_save():
     """Test saving data to secondary database"""
 
     print("=" * 80)
@@ -34,11 +34,14 @@ async def test_save():
         print(f"Database: {db_name}")
         print(f"Collection: trinity_performance_marketAnalysis\n")
 
-        # Create client
-        client = AsyncIOMotorClient(uri)
+        # Shared client (reused across scripts in the same process)
+        client = get_sync_client('SECONDARY_MONGODB_URI')
         db = client[db_name]
         collection = db['trinity_performance_marketAnalysis']
 
+        # One UTC timestamp for every date field (BSON dates are UTC)
+        now = datetime.now(timezone.utc)
+
         # Create test document
         test_data = {
             "direction": "FLAT",
@@ -52,25 +55,26 @@ async def test_save():
                 "12H": {"best": [], "worst": []},
                 "1D": {"best": [], "worst": []}
             },
-            "timestamp": datetime.now(),
-            "createdAt": datetime.now(),
-            "updatedAt": datetime.now()
+            "timestamp": now,
+            "createdAt": now,
+            "updatedAt": now
         }
 
         print("Attempting to save test document...")
-        print(f"Document size: ~{len(str(test_data))} bytes\n")
+        # Actual BSON size, i.e. what the server receives (16MB max per document)
+        print(f"Document size: {len(encode(test_data))} bytes\n")
 
         # Try to insert
-        result = await collection.insert_one(test_data)
+        result = collection.insert_one(test_data)
 
         print(f"SUCCESS! Document inserted with _id: {result.inserted_id}")
 
         # Verify
-        count = await collection.count_documents({})
+        count = collection.count_documents({})
         print(f"Total documents in collection: {count}")
 
         # Read back
-        saved_doc = await collection.find_one({"_id": result.inserted_id})
+        saved_doc = collection.find_one({"_id": result.inserted_id})
         if saved_doc:
             print(f"\nVerified - Document saved successfully:")
             print(f"  Direction: {saved_doc.get('direction')}")
@@ -81,8 +85,6 @@ async def test_save():
         print("TEST PASSED - Secondary database is working!")
         print("=" * 80)
 
-        client.close()
-
     except Exception as e:
         print(f"\nERROR: {e}")
         print("\nFull error details:")
@@ -94,4 +96,4 @@ async def test_save():
         print("=" * 80)
 
 if __name__ == "__main__":
-    asyncio.run(test_save())
+    test_save()
@@ -16,39 +16,45 @@ from repositories.candle_repository import CandleRepository
 async def verify_timeframes():
     """Verificar configuracion de timeframes"""
 
-    print("=" * 70)
-    print("VERIFICACION DE TIMEFRAMES")
-    print("=" * 70)
-    print()
+    # Construir el reporte en memoria y escribirlo una sola vez
+    lines = []
+    out = lines.append
+
+    out("=" * 70)
+    out("VERIFICACION DE TIMEFRAMES")
+    out("=" * 70)
+    out("")
 
     # 1. Verificar configuracion del servicio
     candlestick_service = CandlestickService()
-    print("1. Timeframes configurados en CandlestickService:")
-    print(f"   {candlestick_service.timeframes}")
-    print()
+    out("1. Timeframes configurados en CandlestickService:")
+    out(f"   {candlestick_service.timeframes}")
+    out("")
 
     # 2. Conectar a la base de datos
-    print("2. Conectando a MongoDB...")
+    out("2. Conectando a MongoDB...")
     await db_config.connect()
-    print("   Conectado exitosamente")
-    print()
+    out("   Conectado exitosamente")
+    out("")
 
     # 3. Verificar candlesticks existentes por timeframe
-    print("3. Candlesticks existentes en la base de datos:")
+    out("3. Candlesticks existentes en la base de datos:")
     candle_repo = CandleRepository()
 
+    # Contar todos los timeframes en una sola agregacion (sin cargar las velas)
+    counts = await candle_repo.count_by_timeframe()
+
     for timeframe in candlestick_service.timeframes:
-        candles = await candle_repo.find_by_timeframe(timeframe)
-        count = len(candles) if candles else 0
+        count = counts.get(timeframe, 0)
         status = "OK" if count > 0 else "VACIO"
-        print(f"   [{status}] {timeframe:5s} -> {count} candlesticks")
+        out(f"   [{status}] {timeframe:5s} -> {count} candlesticks")
 
-    print()
+    out("")
 
     # 4. Mostrar resumen
-    print("=" * 70)
-    print("RESUMEN:")
-    print("-" * 70)
+    out("=" * 70)
+    out("RESUMEN:")
+    out("-" * 70)
 
     expected = ['15m', '30m', '1h', '4h', '12h', '1d']
     current = candlestick_service.timeframes
@@ -57,25 +63,27 @@ async def verify_timeframes():
     extra = set(current) - set(expected)
 
     if missing:
-        print(f"TIMEFRAMES FALTANTES: {missing}")
+        out(f"TIMEFRAMES FALTANTES: {missing}")
 
     if extra:
-        print(f"TIMEFRAMES EXTRA: {extra}")
+        out(f"TIMEFRAMES EXTRA: {extra}")
 
     if not missing and not extra:
-        print("Todos los timeframes esperados estan configurados correctamente")
+        out("Todos los timeframes esperados estan configurados correctamente")
 
-    print("=" * 70)
-    print()
+    out("=" * 70)
+    out("")
 
     # 5. Verificar OKX Service mapping
     from services.okx_service import OKXService
     okx_service = OKXService()
 
-    print("4. Mapeo de timeframes en OKXService:")
+    out("4. Mapeo de timeframes en OKXService:")
     for tf, okx_tf in okx_service.timeframe_map.items():
-        print(f"   {tf:5s} -> {okx_tf}")
-    print()
+        out(f"   {tf:5s} -> {okx_tf}")
+    out("")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
     # Desconectar
     await db_config.disconnect()
@@ -1,18 +1,27 @@
+import os
+import time
 import logging
 import asyncio
-from typing import List, Dict, Any
-from datetime import datetime
-from config.database import db_config
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+from datetime import datetime, timezone
+import orjson
 from repositories.candle_repository import CandleRepository
 from repositories.secondary_candle_repository import SecondaryCandleRepository
 from repositories.token_repository import TokenRepository
 from services.okx_service import OKXService
 from services.websocket_service import websocket_service
 from services.failed_token_service import FailedTokenService
+from services.event_bus import event_bus
 from models.candle_model import CandleModel, CandleResponse
 
 logger = logging.getLogger(__name__)
 
+# Seconds a cached token name stays valid (tier1 runs every 5s over the same symbols)
+TOKEN_CACHE_TTL = 60
+
+# TOP 10 tokens refreshed by TIER 1 (excluded from TIER 2 and TIER 3)
+TIER1_SYMBOLS = frozenset({'BTC', 'ETH', 'XRP', 'BNB', 'SOL', 'USDT', 'USDC', 'DOGE', 'ADA', 'TRX'})
+
 class CandlestickService:
     """
     Business logic service for candlestick operations
@@ -20,6 +29,18 @@ class CandlestickService:
     Writes to PRIMARY and SECONDARY databases
     """
 
+    __slots__ = (
+        'candle_repository',
+        'secondary_candle_repository',
+        'token_repository',
+        'okx_service',
+        'failed_token_service',
+        'timeframes',
+        'refresh_concurrency',
+        '_refresh_sem',
+        '_token_cache'
+    )
+
     def __init__(self):
         self.candle_repository = CandleRepository()
         self.secondary_candle_repository = SecondaryCandleRepository()
@@ -28,6 +49,14 @@ class CandlestickService:
         self.failed_token_service = FailedTokenService()
         self.timeframes = ['15m', '30m', '1h', '4h', '12h', '1d']  # Actualizado con 4h y 1d
 
+        # Max candle refreshes in flight across all tiers (protects Mongo pool and OKX rate limits)
+        self.refresh_concurrency = int(os.getenv('REFRESH_CONCURRENCY', '32'))
+        self._refresh_sem = asyncio.Semaphore(self.refresh_concurrency)
+
+        # symbol -> (expires_at, name) for the tier refreshes; cleared when tokens are refreshed
+        self._token_cache: Dict[str, Tuple[float, str]] = {}
+        event_bus.on('tokens_refreshed', self._on_tokens_refreshed)
+
     async def update_all_candlesticks(self) -> Dict[str, Any]:
         """
         Update candlesticks for all Trinity tokens
@@ -63,7 +92,8 @@ class CandlestickService:
 
             # STEP 3: Fetch fresh data from OKX using CONCURRENT BATCH PROCESSING
             logger.info("STEP 3: Fetching fresh candlestick data from OKX API (concurrent mode)...")
-            logger.info(f"Processing {len(tokens)} tokens x {len(self.timeframes)} timeframes = {len(tokens) * len(self.timeframes)} total requests")
+            expected_count = len(tokens) * len(self.timeframes)
+            logger.info(f"Processing {len(tokens)} tokens x {len(self.timeframes)} timeframes = {expected_count} total requests")
 
             # Use new batch method for massive performance improvement
             all_candles = await self.okx_service.get_candlesticks_batch(
@@ -73,24 +103,27 @@ class CandlestickService:
 
             # STEP 3B: Identify successful and failed tokens
             logger.info("STEP 3B: Analyzing successful and failed tokens...")
-            successful_symbols = set(candle['symbol'] for candle in all_candles)
+            successful_symbols = {candle['symbol'] for candle in all_candles}
             failed_tokens_data = []
 
-            print(f"\n=== DEBUG: Analyzing tokens ===")
-            print(f"Total tokens to check: {len(tokens)}")
-            print(f"Candlesticks retrieved: {len(all_candles)}")
-            print(f"Unique successful symbols: {len(successful_symbols)}")
+            logger.debug(
+                "Analyzing tokens: %d to check, %d candlesticks retrieved, %d unique successful symbols",
+                len(tokens), len(all_candles), len(successful_symbols)
+            )
+
+            # Tokens that got no candlesticks, in one set difference (empty on the happy path)
+            failed_symbols = {token.get('symbol') for token in tokens} - successful_symbols
+            failed_symbols.discard(None)
 
-            for token in tokens:
+            for token in (tokens if failed_symbols else ()):
                 symbol = token.get('symbol')
-                if symbol and symbol not in successful_symbols:
+                if symbol in failed_symbols:
                     # This token failed - no candlesticks retrieved
-                    print(f"FAILED TOKEN: {symbol} ({token.get('name')}) - adding to failed tokens list")
                     failed_tokens_data.append({
                         'symbol': symbol,
                         'name': token.get('name', symbol),
-                        'market_cap': token.get('market_cap'),
-                        'rank': token.get('rank'),
+                        'market_cap': token.get('marketCap'),
+                        'rank': token.get('cmcRank'),
                         'attempted_pair': f"{symbol}-USDT",
                         'reason': "No data retrieved from OKX (pair may not exist)",
                         'timeframes_failed': self.timeframes,
@@ -99,12 +132,11 @@ class CandlestickService:
 
             logger.info(f"Successful tokens: {len(successful_symbols)}")
             logger.info(f"Failed tokens: {len(failed_tokens_data)}")
-            print(f"Failed tokens count: {len(failed_tokens_data)}")
-            if failed_tokens_data:
-                print(f"Failed token symbols: {[t['symbol'] for t in failed_tokens_data]}")
+            # Only build the symbol list when debug logging is on
+            if failed_tokens_data and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("FAILED: %s", ",".join(t['symbol'] for t in failed_tokens_data))
 
             success_count = len(all_candles)
-            expected_count = len(tokens) * len(self.timeframes)
             error_count = expected_count - success_count
 
             # STEP 4A: UPSERT all candles (update existing, insert new)
@@ -167,7 +199,7 @@ class CandlestickService:
             await websocket_service.emit_candlesticks_updated({
                 'updated_count': upserted_count,
                 'deleted_count': deleted_count,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': datetime.now(timezone.utc).isoformat()
             })
 
             return result
@@ -214,8 +246,8 @@ class CandlestickService:
                 candles = await self.candle_repository.find_all_ordered_by_performance(limit)
                 message = "All candlesticks ordered by 24h performance"
 
-            # Convert to Pydantic models
-            candle_models = [CandleModel(**candle) for candle in candles]
+            # Convert to Pydantic models (rows come from our own collection: skip validation)
+            candle_models = [CandleModel.model_construct(**candle) for candle in candles]
 
             return CandleResponse(
                 status="success",
@@ -233,6 +265,63 @@ class CandlestickService:
                 data=[]
             )
 
+    async def stream_all_candlesticks(self, limit: int = 1000) -> AsyncIterator[bytes]:
+        """
+        Open a stream of all candlesticks ordered by 24h performance as a CandleResponse JSON body
+        The first candle is fetched before anything is sent, so a database error raises here
+        (and becomes a 5xx) instead of truncating a 200 response
+
+        Args:
+            limit: Maximum number of results
+        """
+        candles = self.candle_repository.iter_all_ordered_by_performance(limit)
+        try:
+            first = await candles.__anext__()
+        except StopAsyncIteration:
+            first = None
+
+        return self._stream_candles(first, candles)
+
+    async def _stream_candles(
+        self,
+        first: Optional[Dict[str, Any]],
+        candles: AsyncIterator[Dict[str, Any]]
+    ) -> AsyncIterator[bytes]:
+        """
+        Serialize candles as they come off the cursor, without building the full list
+        The status fields go after the data so an error mid-stream still closes valid JSON
+        """
+        count = 0
+        status = "success"
+        message = "All candlesticks ordered by 24h performance"
+
+        yield b'{"data":['
+        try:
+            if first is not None:
+                candle = first
+                while True:
+                    # Same defaults CandleModel applies to missing optional fields
+                    candle.setdefault('name', '')
+                    candle.setdefault('timestamp', None)
+                    yield (b',' if count else b'') + orjson.dumps(candle)
+                    count += 1
+                    try:
+                        candle = await candles.__anext__()
+                    except StopAsyncIteration:
+                        break
+
+        except Exception as e:
+            logger.error(f"Error streaming candlesticks: {e}")
+            status = "error"
+            message = str(e)
+
+        yield b'],' + orjson.dumps({
+            'status': status,
+            'message': message,
+            'count': count,
+            'timestamp': datetime.now(timezone.utc)
+        })[1:]
+
     async def get_candlestick_stats(self) -> Dict[str, Any]:
         """Get statistics about candlesticks"""
         try:
@@ -242,7 +331,7 @@ class CandlestickService:
                 'status': 'success',
                 'total_candles': total_candles,
                 'timeframes': self.timeframes,
-                'last_check': datetime.now().isoformat()
+                'last_check': datetime.now(timezone.utc).isoformat()
             }
 
         except Exception as e:
@@ -302,10 +391,10 @@ class CandlestickService:
 
                 # Emit update notification to frontend
                 await websocket_service.emit_candlesticks_updated({
-                    'updated_count': updated_count['inserted'] + updated_count['modified'],
+                    'updated_count': updated_count,
                     'deleted_count': 0,
                     'timeframe': timeframe,
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': datetime.now(timezone.utc).isoformat()
                 })
 
                 logger.info("=" * 70)
@@ -317,7 +406,7 @@ class CandlestickService:
                     'message': f'Updated {updated_count} candles for timeframe {timeframe}',
                     'updated_count': updated_count,
                     'timeframe': timeframe,
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': datetime.now(timezone.utc).isoformat()
                 }
             else:
                 logger.warning(f"No candles retrieved for timeframe {timeframe}")
@@ -336,78 +425,56 @@ class CandlestickService:
             }
 
 
-    async def _refresh_single_candle(self, symbol: str, name: str, timeframe: str) -> bool:
+    async def _get_token_names(self, symbols: List[str], ttl: float = TOKEN_CACHE_TTL) -> Dict[str, str]:
         """
-        Actualiza una sola vela consultando OKX
-        Si la vela cambio (nuevo openTimestamp), actualiza TODO incluyendo open y timestamps
-        Si es la misma vela, solo actualiza close, high, low, performance
+        Get {symbol: name} for the given symbols, served from a TTL cache
+        Only symbols missing or expired in the cache are looked up, in a single query
         """
-        try:
-            # Obtener vela actual de OKX
-            candle_okx = await self.okx_service.get_candlestick(
-                symbol=symbol,
-                timeframe=timeframe,
-                name=name
-            )
-
-            if not candle_okx:
-                return False
-
-            # Obtener vela actual de BD para comparar timestamps
-            collection = db_config.get_collection('trinityCandles')
-            candle_bd = await collection.find_one({
-                'symbol': symbol,
-                'timeframe': timeframe
-            })
-
-            if not candle_bd:
-                # No existe en BD, hacer upsert completo en PRIMARY
-                await self.candle_repository.upsert_candle(candle_okx)
-
-                # Sync to SECONDARY database
-                try:
-                    await self.secondary_candle_repository.bulk_upsert_candles_with_retry([candle_okx])
-                except Exception as e:
-                    logger.error(f"[SECONDARY DB] Failed to sync new candle {symbol} {timeframe}: {e}")
-
-                return True
-
-            # Comparar openTimestamp para detectar si es nueva vela
-            okx_open_ts = candle_okx['openTimestamp']
-            bd_open_ts = candle_bd.get('openTimestamp')
+        now = time.monotonic()
+        cache = self._token_cache
+        name_map = {}
+        missing = []
+
+        for symbol in symbols:
+            entry = cache.get(symbol)
+            if entry is not None and entry[0] > now:
+                name_map[symbol] = entry[1]
+            else:
+                missing.append(symbol)
 
-            if okx_open_ts != bd_open_ts:
-                # NUEVA VELA: La vela cerró y OKX tiene una nueva
-                # Actualizar TODO incluyendo open, openTimestamp, closeTimestamp en PRIMARY
-                await self.candle_repository.upsert_candle(candle_okx)
+        if missing:
+            tokens = await self.token_repository.find_by_symbols(
+                missing,
+                projection={'symbol': 1, 'name': 1, '_id': 0}
+            )
+            expires_at = now + ttl
+            for token in tokens:
+                name = token.get('name', token['symbol'])
+                cache[token['symbol']] = (expires_at, name)
+                name_map[token['symbol']] = name
 
-                # Sync to SECONDARY database
-                try:
-                    await self.secondary_candle_repository.bulk_upsert_candles_with_retry([candle_okx])
-                except Exception as e:
-                    logger.error(f"[SECONDARY DB] Failed to sync updated candle {symbol} {timeframe}: {e}")
+        return name_map
 
-                return True
-            else:
-                # MISMA VELA: Solo actualizar precios intermedios
-                update_data = {
-                    'close': candle_okx['close'],
-                    'high': candle_okx['high'],
-                    'low': candle_okx['low'],
-                    'performance': candle_okx['performance']
-                }
+    async def _on_tokens_refreshed(self, data: Any = None):
+        """Drop cached token names after a token refresh"""
+        self._token_cache.clear()
 
-                result = await self.candle_repository.update_price_snapshot(
+    async def _fetch_candle(self, symbol: str, name: str, timeframe: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene la vela actual de OKX para un simbolo y timeframe
+        La escritura en BD se hace en lote en _refresh_tokens_by_symbols
+        """
+        try:
+            async with self._refresh_sem:
+                return await self.okx_service.get_candlestick(
                     symbol=symbol,
                     timeframe=timeframe,
-                    update_data=update_data
+                    name=name
                 )
 
-                return result
-
         except Exception as e:
             logger.error(f"Error refreshing {symbol} {timeframe}: {e}")
-            return False
+            return None
 
     async def refresh_tier1_candles(self) -> Dict[str, Any]:
         """
@@ -415,8 +482,7 @@ class CandlestickService:
         BTC, ETH, XRP, BNB, SOL, USDT, USDC, DOGE, ADA, TRX
         50 candles (10 tokens x 5 timeframes) - Completes in ~3 seconds
         """
-        tier1_symbols = ['BTC', 'ETH', 'XRP', 'BNB', 'SOL', 'USDT', 'USDC', 'DOGE', 'ADA', 'TRX']
-        return await self._refresh_tokens_by_symbols(tier1_symbols, tier='TIER1')
+        return await self._refresh_tokens_by_symbols(list(TIER1_SYMBOLS), tier='TIER1')
 
     async def refresh_tier2_candles(self) -> Dict[str, Any]:
         """
@@ -424,13 +490,14 @@ class CandlestickService:
         Approximately 20 tokens - 100 candles - Completes in ~8 seconds
         """
         try:
-            tokens = await self.token_repository.find_by_market_cap(
-                min_market_cap=5_000_000_000,
-                limit=50
-            )
-
-            tier1_symbols = ['BTC', 'ETH', 'XRP', 'BNB', 'SOL', 'USDT', 'USDC', 'DOGE', 'ADA', 'TRX']
-            tier2_symbols = [t['symbol'] for t in tokens if t['symbol'] not in tier1_symbols]
+            tier2_symbols = [
+                t['symbol']
+                async for t in self.token_repository.iter_by_market_cap(
+                    min_market_cap=5_000_000_000,
+                    limit=50
+                )
+                if t['symbol'] not in TIER1_SYMBOLS
+            ]
 
             return await self._refresh_tokens_by_symbols(tier2_symbols, tier='TIER2')
 
@@ -444,17 +511,18 @@ class CandlestickService:
         Approximately 61 tokens - 305 candles - Completes in ~20 seconds
         """
         try:
-            all_tokens = await self.token_repository.find_all()
-
-            tier1_symbols = ['BTC', 'ETH', 'XRP', 'BNB', 'SOL', 'USDT', 'USDC', 'DOGE', 'ADA', 'TRX']
-
-            tokens_tier2 = await self.token_repository.find_by_market_cap(
-                min_market_cap=5_000_000_000,
-                limit=50
+            # Independent queries: run them concurrently
+            all_tokens, tokens_tier2 = await asyncio.gather(
+                self.token_repository.find_all(),
+                self.token_repository.find_by_market_cap(
+                    min_market_cap=5_000_000_000,
+                    limit=50
+                )
             )
-            tier2_symbols = [t['symbol'] for t in tokens_tier2 if t['symbol'] not in tier1_symbols]
 
-            excluded = tier1_symbols + tier2_symbols
+            tier2_symbols = [t['symbol'] for t in tokens_tier2 if t['symbol'] not in TIER1_SYMBOLS]
+
+            excluded = TIER1_SYMBOLS | frozenset(tier2_symbols)
             tier3_symbols = [t['symbol'] for t in all_tokens if t['symbol'] not in excluded]
 
             return await self._refresh_tokens_by_symbols(tier3_symbols, tier='TIER3')
@@ -471,26 +539,47 @@ class CandlestickService:
         try:
             logger.info(f"[{tier}] Updating {len(symbols)} tokens...")
 
-            updated_count = 0
-            update_tasks = []
+            fetch_tasks = []
+
+            name_map = await self._get_token_names(symbols)
 
             for timeframe in self.timeframes:
                 for symbol in symbols:
-                    token = await self.token_repository.find_by_symbol(symbol)
-                    if not token:
+                    if symbol not in name_map:
                         continue
 
-                    name = token.get('name', symbol)
-                    task = self._refresh_single_candle(symbol, name, timeframe)
-                    update_tasks.append(task)
+                    task = self._fetch_candle(symbol, name_map[symbol], timeframe)
+                    fetch_tasks.append(task)
+
+            results = await asyncio.gather(*fetch_tasks, return_exceptions=True)
+            candles = [c for c in results if isinstance(c, dict)]
+
+            # Una sola lectura para comparar openTimestamp de todas las velas
+            stored_open_ts = await self.candle_repository.find_open_timestamps(
+                list(name_map),
+                self.timeframes
+            )
+
+            # Nueva vela (o inexistente en BD): actualizar TODO; misma vela: solo precios intermedios
+            new_candles = []
+            snapshots = []
+            for candle in candles:
+                key = (candle['symbol'], candle['timeframe'])
+                if key in stored_open_ts and stored_open_ts[key] == candle['openTimestamp']:
+                    snapshots.append(candle)
+                else:
+                    new_candles.append(candle)
 
-            results = await asyncio.gather(*update_tasks, return_exceptions=True)
+            updated_count = await self.candle_repository.bulk_refresh(new_candles, snapshots)
 
-            for result in results:
-                if isinstance(result, bool) and result:
-                    updated_count += 1
+            # Sync new candles to SECONDARY database
+            if new_candles:
+                try:
+                    await self.secondary_candle_repository.bulk_upsert_candles_with_retry(new_candles)
+                except Exception as e:
+                    logger.error(f"[SECONDARY DB] Failed to sync {len(new_candles)} new candles: {e}")
 
-            logger.info(f"[{tier}] Updated {updated_count}/{len(update_tasks)} candles")
+            logger.info(f"[{tier}] Updated {updated_count}/{len(fetch_tasks)} candles")
 
             return {
                 'status': 'success',
@@ -517,8 +606,8 @@ class CandlestickService:
         try:
             logger.info(f"Updating candlesticks for {symbol}...")
 
-            candles = await self.okx_service.get_multiple_candlesticks(
-                symbol,
+            candles = await self.okx_service.get_candlesticks_batch(
+                [{'symbol': symbol, 'name': symbol.upper()}],
                 self.timeframes
             )
 
@@ -16,6 +16,8 @@ class CoinMarketCapService:
     Follows Open/Closed Principle - open for extension, closed for modification
     """
 
+    __slots__ = ('api_key', 'base_url', 'headers', 'timeout', 'max_retries', 'base_delay', '_client')
+
     def __init__(self):
         self.api_key = os.getenv('CM_API_KEY', 'tu_api_key_aqui')
         self.base_url = 'https://pro-api.coinmarketcap.com/v1'
@@ -24,43 +26,64 @@ class CoinMarketCapService:
         self.max_retries = 3
         self.base_delay = 1  # seconds
 
+        # Shared HTTP client with connection pooling
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Get or create shared HTTP client with connection pooling"""
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(
+                max_connections=50,
+                max_keepalive_connections=20
+            )
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                headers=self.headers,
+                limits=limits
+            )
+        return self._client
+
+    async def close_client(self):
+        """Close the HTTP client"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
     async def _make_request(
         self,
         endpoint: str,
         params: Dict[str, Any],
         retry_count: int = 0
     ) -> Optional[Dict[str, Any]]:
-        """Make API request with retry logic"""
+        """Make API request with retry logic using shared client"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/{endpoint}",
-                    params=params,
-                    headers=self.headers
-                )
-
-                if response.status_code == 200:
-                    return response.json()
-
-                elif response.status_code == 401:
-                    error_msg = "CoinMarketCap API key is invalid or expired"
-                    logger.error(f"API error 401: {error_msg}")
-                    return {"error": error_msg, "status_code": 401}
-
-                elif response.status_code == 429 and retry_count < self.max_retries:
-                    delay = self.base_delay * (2 ** retry_count)
-                    logger.info(f"Rate limit hit, retrying in {delay}s...")
-                    await asyncio.sleep(delay)
-                    return await self._make_request(endpoint, params, retry_count + 1)
-
-                elif response.status_code == 404:
-                    logger.warning(f"Resource not found: {endpoint}")
-                    return None
-
-                else:
-                    error_msg = f"CoinMarketCap API error: {response.status_code}"
-                    logger.error(error_msg)
-                    return {"error": error_msg, "status_code": response.status_code}
+            client = await self._get_client()
+            response = await client.get(
+                f"{self.base_url}/{endpoint}",
+                params=params
+            )
+
+            if response.status_code == 200:
+                return response.json()
+
+            elif response.status_code == 401:
+                error_msg = "CoinMarketCap API key is invalid or expired"
+                logger.error(f"API error 401: {error_msg}")
+                return {"error": error_msg, "status_code": 401}
+
+            elif response.status_code == 429 and retry_count < self.max_retries:
+                delay = self.base_delay * (2 ** retry_count)
+                logger.info(f"Rate limit hit, retrying in {delay}s...")
+                await asyncio.sleep(delay)
+                return await self._make_request(endpoint, params, retry_count + 1)
+
+            elif response.status_code == 404:
+                logger.warning(f"Resource not found: {endpoint}")
+                return None
+
+            else:
+                error_msg = f"CoinMarketCap API error: {response.status_code}"
+                logger.error(error_msg)
+                return {"error": error_msg, "status_code": response.status_code}
 
         except asyncio.TimeoutError:
             error_msg = "CoinMarketCap API request timeout"
@@ -121,10 +144,11 @@ class CoinMarketCapService:
             return []
 
         # Extract unique exchange names
-        exchanges = set()
-        for pair in token_data['market_pairs']:
-            if pair.get('exchange', {}).get('name'):
-                exchanges.add(pair['exchange']['name'])
+        exchanges = {
+            pair['exchange']['name']
+            for pair in token_data['market_pairs']
+            if pair.get('exchange') and pair['exchange'].get('name')
+        }
 
         return list(exchanges)
 
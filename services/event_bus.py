@@ -4,7 +4,7 @@ Permite desacoplar componentes y reaccionar a cambios en tiempo real
 """
 import logging
 import asyncio
-from typing import Dict, List, Callable, Any
+from typing import Dict, Set, Tuple, Callable, Any, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -15,9 +15,16 @@ class EventBus:
     Permite que servicios se suscriban a eventos y reaccionen en tiempo real
     """
 
+    __slots__ = ('_listeners', '_debounce_timers', '_debounce_pending', '_pending')
+
     def __init__(self):
-        self._listeners: Dict[str, List[Callable]] = {}
+        # Por evento, un dict usado como set ordenado: alta/baja O(1) y sin duplicados
+        self._listeners: Dict[str, Dict[Callable, None]] = {}
+        # Un worker por evento con debounce pendiente, y su (deadline, data) mas reciente
         self._debounce_timers: Dict[str, asyncio.Task] = {}
+        self._debounce_pending: Dict[str, Tuple[float, Any]] = {}
+        # Referencias a las tareas de emit(background=True) para que no se recolecten antes de terminar
+        self._pending: Set[asyncio.Task] = set()
 
     def on(self, event_name: str, callback: Callable):
         """
@@ -27,33 +34,58 @@ class EventBus:
             event_name: Nombre del evento (ej: 'candles_updated')
             callback: Función async a ejecutar cuando ocurra el evento
         """
-        if event_name not in self._listeners:
-            self._listeners[event_name] = []
-
-        self._listeners[event_name].append(callback)
+        self._listeners.setdefault(event_name, {})[callback] = None
         logger.info(f"[EVENT BUS] Registered listener for '{event_name}'")
 
-    async def emit(self, event_name: str, data: Any = None):
+    async def emit(
+        self,
+        event_name: str,
+        data: Any = None,
+        background: bool = False,
+        timeout: Optional[float] = None
+    ):
         """
         Emitir un evento a todos los listeners suscritos
+        Por defecto espera a que todos terminen (back-pressure y orden para el productor)
 
         Args:
             event_name: Nombre del evento a emitir
             data: Datos del evento (opcional)
+            background: Despachar cada listener en su propia tarea y volver sin esperar
+            timeout: Segundos maximos por listener (None = sin limite)
         """
-        if event_name not in self._listeners:
+        callbacks = self._listeners.get(event_name)
+        if not callbacks:
             return
 
-        logger.debug(f"[EVENT BUS] Emitting '{event_name}' to {len(self._listeners[event_name])} listeners")
+        logger.debug(f"[EVENT BUS] Emitting '{event_name}' to {len(callbacks)} listeners")
 
-        # Ejecutar todos los callbacks de forma asíncrona
-        tasks = []
-        for callback in self._listeners[event_name]:
-            tasks.append(callback(data))
+        coros = [
+            asyncio.wait_for(callback(data), timeout=timeout) if timeout is not None else callback(data)
+            for callback in callbacks
+        ]
+
+        if background:
+            for coro in coros:
+                task = asyncio.create_task(coro)
+                self._pending.add(task)
+                task.add_done_callback(self._on_listener_done)
+            return
+
+        # Ejecutar todos los callbacks de forma asíncrona y esperar a que terminen
+        await asyncio.gather(*coros, return_exceptions=True)
+
+    def _on_listener_done(self, task: asyncio.Task):
+        """Liberar la tarea terminada y registrar errores del listener"""
+        self._pending.discard(task)
+        if task.cancelled():
+            return
 
-        # Esperar a que todos los callbacks terminen
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        error = task.exception()
+        if isinstance(error, asyncio.TimeoutError):
+            logger.warning("[EVENT BUS] Listener timed out")
+        elif error is not None:
+            logger.error(f"[EVENT BUS] Listener error: {error}")
 
     async def emit_debounced(self, event_name: str, data: Any = None, delay: int = 5):
         """
@@ -65,30 +97,40 @@ class EventBus:
             data: Datos del evento
             delay: Segundos de delay (default: 5)
         """
-        debounce_key = f"{event_name}_debounced"
-
-        # Cancelar timer anterior si existe
-        if debounce_key in self._debounce_timers:
-            self._debounce_timers[debounce_key].cancel()
-
-        # Crear nuevo timer
-        async def delayed_emit():
-            await asyncio.sleep(delay)
-            logger.info(f"[EVENT BUS] Debounced event '{event_name}' firing after {delay}s delay")
-            await self.emit(event_name, data)
-            # Limpiar timer
-            if debounce_key in self._debounce_timers:
-                del self._debounce_timers[debounce_key]
-
-        self._debounce_timers[debounce_key] = asyncio.create_task(delayed_emit())
+        # Sin listeners no hay nada que programar
+        if not self._listeners.get(event_name):
+            return
+
+        # Mover el deadline; el worker existente lo relee, sin cancelar ni crear tareas
+        loop = asyncio.get_running_loop()
+        self._debounce_pending[event_name] = (loop.time() + delay, data)
+
+        if event_name not in self._debounce_timers:
+            self._debounce_timers[event_name] = asyncio.create_task(self._debounce_worker(event_name))
         logger.debug(f"[EVENT BUS] Debounced '{event_name}' scheduled ({delay}s delay)")
 
+    async def _debounce_worker(self, event_name: str):
+        """Dormir hasta el deadline mas reciente del evento y emitirlo una sola vez"""
+        loop = asyncio.get_running_loop()
+        while True:
+            deadline, data = self._debounce_pending[event_name]
+            wait = deadline - loop.time()
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+
+        # Limpiar antes de emitir: un emit_debounced posterior arranca un worker nuevo
+        del self._debounce_pending[event_name]
+        del self._debounce_timers[event_name]
+
+        logger.info(f"[EVENT BUS] Debounced event '{event_name}' firing")
+        await self.emit(event_name, data)
+
     def remove_listener(self, event_name: str, callback: Callable):
         """Remover un listener específico"""
-        if event_name in self._listeners:
-            self._listeners[event_name] = [
-                cb for cb in self._listeners[event_name] if cb != callback
-            ]
+        callbacks = self._listeners.get(event_name)
+        if callbacks is not None:
+            callbacks.pop(callback, None)
 
     def clear(self, event_name: str = None):
         """
@@ -98,7 +140,7 @@ class EventBus:
             event_name: Nombre específico a limpiar, o None para limpiar todos
         """
         if event_name:
-            self._listeners[event_name] = []
+            self._listeners.pop(event_name, None)
         else:
             self._listeners.clear()
 
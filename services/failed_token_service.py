@@ -1,9 +1,11 @@
+import asyncio
 import logging
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import List, Dict, Any, Awaitable, Set
+from datetime import datetime, timezone
 from repositories.failed_token_repository import FailedTokenRepository
 from repositories.secondary_failed_token_repository import SecondaryFailedTokenRepository
 from models.failed_token_model import FailedTokenModel, FailedTokenResponse, FailedTokenStats
+from services.notification_service import notification_service
 
 logger = logging.getLogger(__name__)
 
@@ -17,23 +19,55 @@ class FailedTokenService:
         self.failed_token_repository = FailedTokenRepository()
         self.secondary_failed_token_repository = SecondaryFailedTokenRepository()
 
+        # SECONDARY writes run as background tasks so requests never wait on the backup DB
+        self._bg_tasks: Set[asyncio.Task] = set()
+        # asyncio.Lock is FIFO: background writes reach SECONDARY in the order they were queued
+        self._secondary_lock = asyncio.Lock()
+
+    def _sync_secondary(self, coro: Awaitable[Dict[str, Any]], action: str):
+        """
+        Run a SECONDARY write in the background (fire-and-forget)
+
+        Args:
+            coro: Secondary repository call returning a {'status': ...} dict
+            action: Description used in log messages
+        """
+        task = asyncio.create_task(self._safe_secondary_call(coro, action))
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+
+    async def _safe_secondary_call(self, coro: Awaitable[Dict[str, Any]], action: str):
+        """Await a SECONDARY write, logging instead of raising on failure"""
+        try:
+            async with self._secondary_lock:
+                result = await coro
+            if result.get('status') == 'success':
+                logger.info(f"[SECONDARY DB] {action}: success")
+            else:
+                logger.error(f"[SECONDARY DB] {action} failed: {result.get('message', result)}")
+        except Exception as e:
+            logger.error(f"[SECONDARY DB] {action} failed: {e}")
+
+    async def drain(self):
+        """Wait for pending SECONDARY writes (graceful shutdown)"""
+        if self._bg_tasks:
+            logger.info(f"[SECONDARY DB] Waiting for {len(self._bg_tasks)} pending failed token syncs")
+            await asyncio.gather(*self._bg_tasks, return_exceptions=True)
+
     async def clear_history(self) -> int:
         """
         Clear all failed tokens from database
         Used before fresh update to ensure clean historical data
         """
         try:
-            # Clear from PRIMARY database
             deleted_count = await self.failed_token_repository.delete_all()
             logger.info(f"[PRIMARY DB] Cleared failed tokens history: {deleted_count} records removed")
 
-            # Clear from SECONDARY database (with retry logic)
-            try:
-                secondary_result = await self.secondary_failed_token_repository.delete_all_with_retry()
-                if secondary_result['status'] == 'success':
-                    logger.info(f"[SECONDARY DB] Cleared {secondary_result['deleted_count']} failed tokens from secondary DB")
-            except Exception as e:
-                logger.error(f"[SECONDARY DB] Failed to clear failed tokens from secondary DB: {e}")
+            # Clear SECONDARY (with retry logic) in the background
+            self._sync_secondary(
+                self.secondary_failed_token_repository.delete_all_with_retry(),
+                "Clear failed tokens"
+            )
 
             return deleted_count
         except Exception as e:
@@ -62,17 +96,14 @@ class FailedTokenService:
                     'count': 0
                 }
 
-            # Insert all failed tokens to PRIMARY database
             inserted_count = await self.failed_token_repository.insert_many(failed_tokens_data)
             logger.info(f"[PRIMARY DB] Successfully recorded {inserted_count} failed tokens")
 
-            # Sync to SECONDARY database (with retry logic)
-            try:
-                secondary_result = await self.secondary_failed_token_repository.bulk_upsert_failed_tokens_with_retry(failed_tokens_data)
-                if secondary_result['status'] == 'success':
-                    logger.info(f"[SECONDARY DB] Failed tokens synced successfully")
-            except Exception as e:
-                logger.error(f"[SECONDARY DB] Failed to sync failed tokens: {e}")
+            # Sync to SECONDARY (with retry logic) in the background
+            self._sync_secondary(
+                self.secondary_failed_token_repository.bulk_upsert_failed_tokens_with_retry(failed_tokens_data),
+                "Sync failed tokens"
+            )
 
             return {
                 'status': 'success',
@@ -113,23 +144,30 @@ class FailedTokenService:
             # Step 1: Get previously failed tokens that are now successful
             newly_available_tokens = []
             if successful_symbols:
-                for symbol in successful_symbols:
-                    # Check if this token was previously in failed tokens table
-                    failed_token = await self.failed_token_repository.find_by_symbol(symbol)
-                    if failed_token:
-                        # This token was failed before but is now available!
-                        token_info = {
-                            'symbol': symbol,
-                            'name': failed_token.get('name', symbol),
-                            'market_cap': failed_token.get('market_cap')
-                        }
-                        newly_available_tokens.append(token_info)
-                        logger.info(f"🎉 Token {symbol} is now available in OKX!")
+                # One query for every successful symbol previously in the failed tokens table
+                previously_failed = {
+                    doc['symbol']: doc
+                    for doc in await self.failed_token_repository.find_by_symbols(successful_symbols)
+                }
+
+                # These tokens were failed before but are now available!
+                newly_available_tokens = [
+                    {
+                        'symbol': symbol,
+                        'name': failed_token.get('name', symbol),
+                        'market_cap': failed_token.get('market_cap')
+                    }
+                    for symbol, failed_token in (
+                        (symbol, previously_failed.get(symbol.upper())) for symbol in successful_symbols
+                    )
+                    if failed_token
+                ]
+                if newly_available_tokens:
+                    logger.info(f"🎉 Tokens now available in OKX: {[t['symbol'] for t in newly_available_tokens]}")
 
             # Step 2: Create notifications for newly available tokens
             notifications_created = 0
             if newly_available_tokens:
-                from services.notification_service import notification_service
                 notifications_created = await notification_service.create_bulk_token_available_notifications(
                     newly_available_tokens
                 )
@@ -138,32 +176,31 @@ class FailedTokenService:
             # Step 3: Remove tokens that are now available in OKX
             deleted_count = 0
             if successful_symbols:
-                # Delete from PRIMARY database
                 deleted_count = await self.failed_token_repository.delete_by_symbols(successful_symbols)
                 logger.info(f"[PRIMARY DB] Removed {deleted_count} tokens that are now available in OKX")
 
-                # Delete from SECONDARY database (with retry logic)
-                try:
-                    secondary_result = await self.secondary_failed_token_repository.delete_by_symbols_with_retry(successful_symbols)
-                    if secondary_result['status'] == 'success':
-                        logger.info(f"[SECONDARY DB] Removed {secondary_result['deleted_count']} tokens from secondary DB")
-                except Exception as e:
-                    logger.error(f"[SECONDARY DB] Failed to remove tokens from secondary DB: {e}")
+                # Delete from SECONDARY (with retry logic) in the background
+                self._sync_secondary(
+                    self.secondary_failed_token_repository.delete_by_symbols_with_retry(successful_symbols),
+                    "Remove available tokens"
+                )
 
             # Step 4: Add or update failed tokens
             upserted_count = 0
             if failed_tokens_data:
-                # Upsert to PRIMARY database
-                upserted_count = await self.failed_token_repository.upsert_many(failed_tokens_data)
+                # One write per symbol: duplicates collapse to their LAST occurrence (last wins)
+                deduped_tokens = list({token['symbol']: token for token in failed_tokens_data}.values())
+                if len(deduped_tokens) < len(failed_tokens_data):
+                    logger.info(f"Deduplicated failed tokens: {len(failed_tokens_data)} -> {len(deduped_tokens)}")
+
+                upserted_count = await self.failed_token_repository.upsert_many(deduped_tokens)
                 logger.info(f"[PRIMARY DB] Upserted {upserted_count} failed tokens")
 
-                # Sync to SECONDARY database (with retry logic)
-                try:
-                    secondary_result = await self.secondary_failed_token_repository.bulk_upsert_failed_tokens_with_retry(failed_tokens_data)
-                    if secondary_result['status'] == 'success':
-                        logger.info(f"[SECONDARY DB] Failed tokens synced successfully")
-                except Exception as e:
-                    logger.error(f"[SECONDARY DB] Failed to sync failed tokens: {e}")
+                # Sync to SECONDARY (with retry logic) in the background
+                self._sync_secondary(
+                    self.secondary_failed_token_repository.bulk_upsert_failed_tokens_with_retry(deduped_tokens),
+                    "Sync failed tokens"
+                )
 
             return {
                 'status': 'success',
@@ -195,8 +232,8 @@ class FailedTokenService:
         try:
             failed_tokens = await self.failed_token_repository.find_all(limit)
 
-            # Convert to Pydantic models
-            failed_token_models = [FailedTokenModel(**token) for token in failed_tokens]
+            # Convert to Pydantic models (rows come from our own collection: skip validation)
+            failed_token_models = [FailedTokenModel.model_construct(**token) for token in failed_tokens]
 
             return FailedTokenResponse(
                 status="success",
@@ -230,8 +267,9 @@ class FailedTokenService:
             Dictionary with comprehensive statistics
         """
         try:
-            # Get count of failed tokens
-            failed_count = await self.failed_token_repository.count_failed_tokens()
+            # Get count of failed tokens and failure reasons breakdown (one round-trip)
+            detailed_stats = await self.failed_token_repository.get_statistics()
+            failed_count = detailed_stats.get('total_failed', 0)
 
             # Calculate successful tokens (assuming 5 timeframes per token)
             successful_tokens = successful_candlesticks // 5 if successful_candlesticks > 0 else 0
@@ -239,16 +277,13 @@ class FailedTokenService:
             # Calculate success rate
             success_rate = (successful_tokens / total_tokens_attempted * 100) if total_tokens_attempted > 0 else 0
 
-            # Get failure reasons breakdown
-            detailed_stats = await self.failed_token_repository.get_statistics()
-
             stats = FailedTokenStats(
                 total_tokens_attempted=total_tokens_attempted,
                 successful_tokens=successful_tokens,
                 failed_tokens=failed_count,
                 success_rate=round(success_rate, 2),
                 total_candlesticks=successful_candlesticks,
-                last_update=datetime.now()
+                last_update=datetime.now(timezone.utc)
             )
 
             return {
@@ -281,7 +316,7 @@ class FailedTokenService:
                 return {
                     'status': 'success',
                     'found': True,
-                    'data': FailedTokenModel(**failed_token).model_dump()
+                    'data': FailedTokenModel.model_construct(**failed_token).model_dump()
                 }
             else:
                 return {
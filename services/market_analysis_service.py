@@ -1,7 +1,11 @@
+import asyncio
 import logging
 import json
-from typing import Dict, Any, List
-from datetime import datetime
+import time
+import orjson
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+from bson import ObjectId
 from repositories.market_analysis_repository import MarketAnalysisRepository
 from repositories.secondary_market_analysis_repository import SecondaryMarketAnalysisRepository
 from repositories.candle_repository import CandleRepository
@@ -14,6 +18,9 @@ from models.market_analysis_model import (
 
 logger = logging.getLogger(__name__)
 
+# Seconds the latest analysis is served from memory (it changes every 5 minutes)
+LATEST_ANALYSIS_TTL = 60
+
 class MarketAnalysisService:
     """
     Market Analysis Service
@@ -26,6 +33,15 @@ class MarketAnalysisService:
         self.candle_repository = CandleRepository()
         self.available_timeframes = ['15m', '30m', '1h', '4h', '12h', '1d']
 
+        # (expires_at, JSON bytes) for get_latest_analysis; concurrent misses share one DB read.
+        # Kept serialized so every caller gets its own dict and can't corrupt the cache
+        self._latest_cache: Optional[Tuple[float, bytes]] = None
+        self._cache_lock = asyncio.Lock()
+        self._cache_generation = 0
+        # (timestamp, updatedAt) -> JSON bytes of the last document read; the collection
+        # holds a single analysis, so one entry is enough to skip re-walking an unchanged one
+        self._serialized_latest: Optional[Tuple[Tuple[Any, Any], bytes]] = None
+
     async def analyze_all_timeframes(self) -> MarketAnalysisModel:
         """
         Analyze all timeframes and generate nested structure
@@ -42,88 +58,27 @@ class MarketAnalysisService:
             total_bearish = 0
             total_count = 0
 
-            # Analyze each timeframe
-            for timeframe in self.available_timeframes:
-                logger.info(f"[MARKET ANALYSIS] Analyzing {timeframe}...")
+            # Counts and top/bottom performers computed server-side, all timeframes concurrently
+            summaries = await asyncio.gather(*[
+                self.candle_repository.get_performance_summary(timeframe, top_n=10)
+                for timeframe in self.available_timeframes
+            ])
 
-                # Get candles for this timeframe
-                candles = await self.candle_repository.find_by_timeframe(timeframe)
+            # Analyze each timeframe
+            for timeframe, summary in zip(self.available_timeframes, summaries):
+                logger.info("[MARKET ANALYSIS] Analyzing %s...", timeframe)
 
-                if not candles or len(candles) == 0:
+                if summary['total'] == 0:
                     logger.warning(f"No candles found for {timeframe}, skipping...")
                     timeframe_analyses[timeframe] = TimeframeAnalysis(best=[], worst=[])
                     continue
 
-                # Collect token data
-                token_data = []
-                bullish = 0
-                bearish = 0
-
-                for candle in candles:
-                    performance = candle.get('performance', 0)
-
-                    # Store the COMPLETE candle object (not just symbol, name, performance)
-                    # Need to serialize MongoDB ObjectId to string
-                    candle_copy = dict(candle)
-
-                    # Convert ObjectId to string if present
-                    if '_id' in candle_copy:
-                        from bson import ObjectId
-                        if isinstance(candle_copy['_id'], ObjectId):
-                            candle_copy['_id'] = str(candle_copy['_id'])
-
-                    # Convert datetime objects to ISO format strings
-                    for key, value in candle_copy.items():
-                        if isinstance(value, datetime):
-                            candle_copy[key] = value.isoformat()
-
-                    # Replace 'performance' with 'rendimiento' (NEW structure)
-                    # Remove old 'performance' field if it exists
-                    if 'performance' in candle_copy:
-                        del candle_copy['performance']
-
-                    # Remove 'name' field (redundant, not needed in new structure)
-                    if 'name' in candle_copy:
-                        del candle_copy['name']
-
-                    # Remove 'openTimestamp' field (use 'timestamp' instead)
-                    # Save openTimestamp value before deletion for timestamp fallback
-                    open_timestamp_value = candle_copy.get('openTimestamp')
-                    if 'openTimestamp' in candle_copy:
-                        del candle_copy['openTimestamp']
-
-                    # Remove 'closeTimestamp' field (not needed in new structure)
-                    if 'closeTimestamp' in candle_copy:
-                        del candle_copy['closeTimestamp']
-
-                    # Use 'rendimiento' instead (full precision)
-                    candle_copy['rendimiento'] = performance
-
-                    # Add volume if not present (default to 0)
-                    if 'volume' not in candle_copy:
-                        candle_copy['volume'] = 0
-
-                    # Add timestamp if not present (use openTimestamp value as fallback)
-                    if 'timestamp' not in candle_copy and open_timestamp_value:
-                        candle_copy['timestamp'] = open_timestamp_value
-
-                    # Add __v if not present (Mongoose version key, default to 0)
-                    if '__v' not in candle_copy:
-                        candle_copy['__v'] = 0
-
-                    token_data.append(candle_copy)
-
-                    if performance > 0:
-                        bullish += 1
-                    elif performance < 0:
-                        bearish += 1
-
-                # Sort by rendimiento (performance)
-                token_data.sort(key=lambda x: x['rendimiento'], reverse=True)
+                bullish = summary['bullish']
+                bearish = summary['bearish']
 
-                # Get best and worst performers (now with FULL candle data)
-                best_performers = token_data[:10]  # Top 10 with complete candle data
-                worst_performers = token_data[-10:]  # Worst 10 with complete candle data
+                # Get best and worst performers (with FULL candle data)
+                best_performers = [self._to_performer(candle) for candle in summary['best']]
+                worst_performers = [self._to_performer(candle) for candle in summary['worst']]
 
                 # Add position to each group separately (1-indexed ranking)
                 for index, token in enumerate(best_performers, start=1):
@@ -141,9 +96,9 @@ class MarketAnalysisService:
                 # Accumulate for overall direction
                 total_bullish += bullish
                 total_bearish += bearish
-                total_count += len(candles)
+                total_count += summary['total']
 
-                logger.info(f"[{timeframe}] Bullish: {bullish}, Bearish: {bearish}, Total: {len(candles)}")
+                logger.info("[%s] Bullish: %d, Bearish: %d, Total: %d", timeframe, bullish, bearish, summary['total'])
 
             # Calculate overall market direction
             # Thresholds:
@@ -173,7 +128,10 @@ class MarketAnalysisService:
                 direction_number_real = 0.5
                 bullish_percentage = 0
 
-            logger.info(f"[OVERALL] Direction: {direction} ({bullish_percentage:.2f}% bullish, Threshold: 60%+ = LONG, 40%- = SHORT)")
+            logger.info(
+                "[OVERALL] Direction: %s (%.2f%% bullish, Threshold: 60%%+ = LONG, 40%%- = SHORT)",
+                direction, bullish_percentage
+            )
 
             # Create CandlesByTimeframe object
             candles_by_timeframe = CandlesByTimeframe(
@@ -191,11 +149,11 @@ class MarketAnalysisService:
                 directionNumber=direction_number,
                 directionNumberReal=round(direction_number_real, 4),
                 candlesByTimeframe=candles_by_timeframe,
-                timestamp=datetime.now()
+                timestamp=datetime.now(timezone.utc)
             )
 
             logger.info("=" * 70)
-            logger.info(f"[MARKET ANALYSIS NEW] Analysis completed: {direction}")
+            logger.info("[MARKET ANALYSIS NEW] Analysis completed: %s", direction)
             logger.info("=" * 70)
 
             return analysis
@@ -204,12 +162,51 @@ class MarketAnalysisService:
             logger.error(f"Error analyzing all timeframes: {e}")
             raise
 
+    def _to_performer(self, candle: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a stored candle into the best/worst entry structure
+        Keeps the COMPLETE candle object, with 'rendimiento' instead of 'performance'
+        """
+        candle_copy = dict(candle)
+        performance = candle_copy.pop('_perf', candle_copy.get('performance', 0))
+
+        # Convert ObjectId to string if present
+        if isinstance(candle_copy.get('_id'), ObjectId):
+            candle_copy['_id'] = str(candle_copy['_id'])
+
+        # Convert datetime objects to ISO format strings
+        for key, value in candle_copy.items():
+            if isinstance(value, datetime):
+                candle_copy[key] = value.isoformat()
+
+        # Remove old 'performance' and redundant 'name' fields (NEW structure)
+        candle_copy.pop('performance', None)
+        candle_copy.pop('name', None)
+
+        # Remove 'openTimestamp' (use 'timestamp' instead) and 'closeTimestamp'
+        # Save openTimestamp value before deletion for timestamp fallback
+        open_timestamp_value = candle_copy.pop('openTimestamp', None)
+        candle_copy.pop('closeTimestamp', None)
+
+        # Use 'rendimiento' instead (full precision)
+        candle_copy['rendimiento'] = performance
+
+        # Add volume if not present (default to 0)
+        candle_copy.setdefault('volume', 0)
+
+        # Add timestamp if not present (use openTimestamp value as fallback)
+        if 'timestamp' not in candle_copy and open_timestamp_value:
+            candle_copy['timestamp'] = open_timestamp_value
+
+        # Add __v if not present (Mongoose version key, default to 0)
+        candle_copy.setdefault('__v', 0)
+
+        return candle_copy
+
     def _serialize_for_json(self, obj: Any) -> Any:
         """
         Recursively serialize datetime and ObjectId objects for JSON
         """
-        from bson import ObjectId
-
         if isinstance(obj, datetime):
             return obj.isoformat()
         elif isinstance(obj, ObjectId):
@@ -237,6 +234,7 @@ class MarketAnalysisService:
 
             # Save to primary database (MongoDB accepts datetime objects)
             result = await self.market_repository.insert_analysis(analysis_dict)
+            self._invalidate_latest_cache()
             GREEN = '\033[92m'
             BOLD = '\033[1m'
             RESET = '\033[0m'
@@ -275,26 +273,54 @@ class MarketAnalysisService:
         Returns the most recent analysis document
         """
         try:
-            logger.info("[MARKET ANALYSIS] Fetching latest analysis from database...")
-
-            # Get latest analysis from primary database
-            analysis = await self.market_repository.get_latest_analysis()
+            cached = self._latest_cache
+            if cached is not None and time.monotonic() < cached[0]:
+                return orjson.loads(cached[1])
+
+            # Single flight: concurrent misses wait here and reuse the first caller's result
+            async with self._cache_lock:
+                cached = self._latest_cache
+                if cached is not None and time.monotonic() < cached[0]:
+                    return orjson.loads(cached[1])
+
+                generation = self._cache_generation
+                logger.info("[MARKET ANALYSIS] Fetching latest analysis from database...")
+
+                # Get latest analysis from primary database
+                analysis = await self.market_repository.get_latest_analysis()
+
+                if not analysis:
+                    logger.warning("No analysis found in database")
+                    return None
+
+                # Serialize datetime objects for JSON response (reused while the document is unchanged)
+                key = (analysis.get('timestamp'), analysis.get('updatedAt'))
+                serialized = self._serialized_latest
+                if serialized is not None and serialized[0] == key:
+                    payload = serialized[1]
+                else:
+                    payload = orjson.dumps(self._serialize_for_json(analysis))
+                    self._serialized_latest = (key, payload)
 
-            if not analysis:
-                logger.warning("No analysis found in database")
-                return None
+                # Don't cache a read that raced with a newer save
+                if generation == self._cache_generation:
+                    self._latest_cache = (time.monotonic() + LATEST_ANALYSIS_TTL, payload)
 
-            # Serialize datetime objects for JSON response
-            json_safe_dict = self._serialize_for_json(analysis)
+                json_safe_dict = orjson.loads(payload)
 
-            logger.info(f"[MARKET ANALYSIS] Latest analysis retrieved: {json_safe_dict.get('direction', 'Unknown')}")
+                logger.info(f"[MARKET ANALYSIS] Latest analysis retrieved: {json_safe_dict.get('direction', 'Unknown')}")
 
-            return json_safe_dict
+                return json_safe_dict
 
         except Exception as e:
             logger.error(f"Error getting latest analysis: {e}")
             raise
 
+    def _invalidate_latest_cache(self):
+        """Drop the cached latest analysis after a new one is saved"""
+        self._cache_generation += 1
+        self._latest_cache = None
+
     async def analyze_and_save(self) -> Dict[str, Any]:
         """
         Analyze all timeframes and save to both databases
@@ -1,9 +1,10 @@
 import logging
 from typing import List, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 from repositories.notification_repository import NotificationRepository
 from repositories.secondary_notification_repository import SecondaryNotificationRepository
 from models.notification_model import NotificationModel, NotificationResponse
+from services.websocket_service import websocket_service
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +47,7 @@ class NotificationService:
                     'market_cap': market_cap
                 },
                 'read': False,
-                'timestamp': datetime.now()
+                'timestamp': datetime.now(timezone.utc)
             }
 
             # Save to PRIMARY database
@@ -63,7 +64,6 @@ class NotificationService:
                 # Don't raise, continue with primary DB operation
 
             # Emit WebSocket event for real-time notification
-            from services.websocket_service import websocket_service
             await websocket_service.emit_new_notification(notification_data)
 
             return notification
@@ -97,7 +97,7 @@ class NotificationService:
                     'name': name
                 },
                 'read': False,
-                'timestamp': datetime.now()
+                'timestamp': datetime.now(timezone.utc)
             }
 
             notification = await self.notification_repository.insert_one(notification_data)
@@ -137,7 +137,7 @@ class NotificationService:
                         'market_cap': token.get('market_cap')
                     },
                     'read': False,
-                    'timestamp': datetime.now()
+                    'timestamp': datetime.now(timezone.utc)
                 }
                 notifications.append(notification_data)
 
@@ -146,7 +146,6 @@ class NotificationService:
                 logger.info(f"Created {count} token_available notifications")
 
                 # Emit WebSocket events for each notification
-                from services.websocket_service import websocket_service
                 for notification_data in notifications:
                     await websocket_service.emit_new_notification(notification_data)
 
@@ -185,7 +184,7 @@ class NotificationService:
             unread_count = await self.notification_repository.count_unread()
 
             # Convert to Pydantic models
-            notification_models = [NotificationModel(**notif) for notif in notifications]
+            notification_models = [NotificationModel.model_validate(notif) for notif in notifications]
 
             return NotificationResponse(
                 status="success",
@@ -247,8 +246,19 @@ class NotificationService:
             Number of notifications marked as read
         """
         try:
+            # Snapshot the unread ids first so SECONDARY is updated with one batched update
+            unread_ids = await self.notification_repository.find_unread_ids()
             count = await self.notification_repository.mark_all_as_read()
 
+            # Mark in SECONDARY database (with retry logic)
+            if unread_ids:
+                try:
+                    secondary_result = await self.secondary_notification_repository.mark_many_as_read_with_retry(unread_ids)
+                    if secondary_result['status'] == 'success':
+                        logger.info(f"[SECONDARY DB] {secondary_result['modified_count']} notifications marked as read")
+                except Exception as e:
+                    logger.error(f"[SECONDARY DB] Failed to mark notifications as read: {e}")
+
             return {
                 'status': 'success',
                 'message': f'Marked {count} notifications as read',
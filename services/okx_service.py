@@ -2,7 +2,7 @@ import httpx
 import asyncio
 import logging
 from typing import Dict, Any, Optional, List
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 logger = logging.getLogger(__name__)
 
@@ -212,7 +212,7 @@ class OKXService:
                     logger.info(f"[CANDLES] {symbol} {timeframe}: Obtenidas {len(candles)} velas de {okx_timeframe}")
 
                 timestamp_ms = int(current_candle[0])
-                open_timestamp = datetime.fromtimestamp(timestamp_ms / 1000)
+                open_timestamp = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
 
                 # Calcular close_timestamp basado en el timeframe SOLICITADO
                 timeframe_minutes = {
@@ -333,22 +333,8 @@ class OKXService:
         Returns:
             List of candle dicts
         """
-        # Create tasks for all timeframes concurrently
-        tasks = [
-            self.get_candlestick(symbol, timeframe, name)
-            for timeframe in timeframes
-        ]
-
-        # Execute all tasks concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Filter out None values and exceptions
-        candles = [
-            result for result in results
-            if result is not None and not isinstance(result, Exception)
-        ]
-
-        return candles
+        # Single-token case of the batch path (same client, semaphore and filtering)
+        return await self.get_candlesticks_batch([{'symbol': symbol, 'name': name}], timeframes)
 
     async def get_candlesticks_batch(
         self,
@@ -366,8 +352,8 @@ class OKXService:
         Returns:
             List of all candles from all tokens
         """
-        logger.info(f"Starting batch processing for {len(tokens)} tokens with {len(timeframes)} timeframes each")
-        logger.info(f"Total requests: {len(tokens) * len(timeframes)} (processing {self.max_concurrent_requests} at a time)")
+        logger.debug(f"Starting batch processing for {len(tokens)} tokens with {len(timeframes)} timeframes each")
+        logger.debug(f"Total requests: {len(tokens) * len(timeframes)} (processing {self.max_concurrent_requests} at a time)")
 
         # Create tasks for ALL tokens and timeframes
         tasks = []
@@ -391,6 +377,8 @@ class OKXService:
             if result is not None and not isinstance(result, Exception)
         ]
 
-        logger.info(f"Batch processing completed: {len(candles)} candles retrieved successfully")
+        # get_multiple_timeframes routes every single token through here: log real batches only
+        log = logger.info if len(tokens) > 1 else logger.debug
+        log(f"Batch processing completed: {len(tokens)} tokens, {len(candles)} candles retrieved successfully")
 
         return candles
@@ -1,7 +1,7 @@
 import asyncio
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
 import websockets
 from repositories.candle_repository import CandleRepository
@@ -10,6 +10,9 @@ from services.websocket_service import websocket_service
 
 logger = logging.getLogger(__name__)
 
+# Campos de la vela que necesita el calculo de snapshots
+SNAPSHOT_CANDLE_PROJECTION = {'symbol': 1, 'open': 1, 'high': 1, 'low': 1, '_id': 0}
+
 class OKXWebSocketService:
     """
     Service for connecting to OKX WebSocket and receiving real-time price updates
@@ -84,7 +87,7 @@ class OKXWebSocketService:
         logger.info("=" * 70)
 
         self.is_running = True
-        self.start_time = datetime.now()
+        self.start_time = datetime.now(timezone.utc)
 
         await self._load_tokens()
         asyncio.create_task(self._connect_loop())
@@ -267,7 +270,7 @@ class OKXWebSocketService:
         try:
             async for message in self.ws:
                 self.messages_received += 1
-                self.last_message_time = datetime.now()
+                self.last_message_time = datetime.now(timezone.utc)
 
                 try:
                     data = json.loads(message)
@@ -331,7 +334,7 @@ class OKXWebSocketService:
                 return
 
             timestamp_ms = int(candle_array[0])
-            timestamp = datetime.fromtimestamp(timestamp_ms / 1000)
+            timestamp = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
 
             open_price = float(candle_array[1])
             high_price = float(candle_array[2])
@@ -398,7 +401,7 @@ class OKXWebSocketService:
                 'open_24h': open_24h,
                 'volume_24h': volume_24h,
                 'performance_24h': round(performance_24h, 2),
-                'timestamp': datetime.now()
+                'timestamp': datetime.now(timezone.utc)
             }
 
             self.ticker_buffer[symbol] = ticker_obj
@@ -422,8 +425,11 @@ class OKXWebSocketService:
             candles_in_db = {}
 
             for timeframe in self.timeframes:
-                candles = await self.candle_repository.find_by_timeframe(timeframe)
-                for candle in candles:
+                # Iterar el cursor directamente: solo un batch en memoria a la vez
+                async for candle in self.candle_repository.iter_by_timeframe(
+                    timeframe,
+                    projection=SNAPSHOT_CANDLE_PROJECTION
+                ):
                     key = f"{candle['symbol']}-{timeframe}"
                     candles_in_db[key] = {
                         'open': candle.get('open', 0),
@@ -495,7 +501,7 @@ class OKXWebSocketService:
         """Get current service status"""
         uptime_seconds = 0
         if self.start_time:
-            uptime_seconds = int((datetime.now() - self.start_time).total_seconds())
+            uptime_seconds = int((datetime.now(timezone.utc) - self.start_time).total_seconds())
 
         return {
             'is_running': self.is_running,
@@ -48,7 +48,7 @@ class SchedulerService:
 
         try:
             self.is_updating = True
-            logger.info(f"Starting scheduled token update at {datetime.now()}")
+            logger.info(f"Starting scheduled token update at {datetime.now(timezone.utc)}")
 
             if not self.token_service:
                 logger.error("Token service not injected")
@@ -64,7 +64,7 @@ class SchedulerService:
                 condition=condition
             )
 
-            self.last_update = datetime.now()
+            self.last_update = datetime.now(timezone.utc)
 
             logger.info(f"Successfully updated {result.count} tokens")
             logger.info(f"Next update scheduled in {self.update_interval_hours} hours")
@@ -82,7 +82,7 @@ class SchedulerService:
 
         try:
             self.is_updating_candles = True
-            logger.info(f"Starting scheduled candlestick update at {datetime.now()}")
+            logger.info(f"Starting scheduled candlestick update at {datetime.now(timezone.utc)}")
 
             if not self.candlestick_service:
                 logger.error("Candlestick service not injected")
@@ -200,7 +200,7 @@ class SchedulerService:
                 await event_bus.emit_debounced('tier1_updated', {
                     'tier': 1,
                     'updated_count': updated_count,
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': datetime.now(timezone.utc).isoformat()
                 }, delay=5)
 
         except Exception as e:
@@ -222,7 +222,7 @@ class SchedulerService:
                 await event_bus.emit_debounced('tier2_updated', {
                     'tier': 2,
                     'updated_count': updated_count,
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': datetime.now(timezone.utc).isoformat()
                 }, delay=5)
 
         except Exception as e:
@@ -9,6 +9,7 @@ from repositories.secondary_token_repository import SecondaryTokenRepository
 from services.coinmarketcap_service import CoinMarketCapService
 from models.token_model import TokenModel, TokenResponse
 from services.websocket_service import websocket_service
+from services.event_bus import event_bus
 
 logger = logging.getLogger(__name__)
 
@@ -44,11 +45,12 @@ class TokenService:
                     min_market_cap,
                     is_on_okx=True if check_exchanges else None,
                     limit=limit,
-                    condition=condition
+                    condition=condition,
+                    projection=None  # TokenModel needs the full document
                 )
 
                 if db_tokens:
-                    tokens = [TokenModel(**token) for token in db_tokens]
+                    tokens = [TokenModel.model_validate(token) for token in db_tokens]
                     return TokenResponse(
                         status="Success",
                         message=f"Data from database (Market Cap {condition} ${min_market_cap:,})",
@@ -83,10 +85,11 @@ class TokenService:
                     min_market_cap,
                     is_on_okx=True if check_exchanges else None,
                     limit=limit,
-                    condition=condition
+                    condition=condition,
+                    projection=None  # TokenModel needs the full document
                 )
 
-                tokens = [TokenModel(**token) for token in db_tokens] if db_tokens else []
+                tokens = [TokenModel.model_validate(token) for token in db_tokens] if db_tokens else []
                 return TokenResponse(
                     status="Warning" if db_tokens else "Error",
                     message=f"Using cached data - API Error: {error_info['error']}" if db_tokens else error_info['error'],
@@ -172,6 +175,9 @@ class TokenService:
                 if deleted_count > 0:
                     logger.info(f"Cleanup: Removed {deleted_count} tokens that don't meet criteria")
 
+                # Let token caches (e.g. candlestick tier lookups) drop stale entries
+                await event_bus.emit('tokens_refreshed', {'count': len(tokens)})
+
             # Convert to models
             token_models = [TokenModel(**token) for token in tokens]
 
@@ -256,7 +262,7 @@ class TokenService:
             # Check database first
             db_token = await self.repository.find_by_symbol(symbol)
             if db_token:
-                return TokenModel(**db_token)
+                return TokenModel.model_validate(db_token)
 
             # Fetch from API
             quote_data = await self.cmc_service.get_token_quote(symbol)
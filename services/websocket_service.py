@@ -2,7 +2,7 @@
 # WebSocket Service
 # ==========================
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List
 import socketio
 from config.database import db_config
@@ -69,7 +69,7 @@ class WebSocketService:
                     'market_cap_filter': 800000000,
                     'filter_condition': 'greater',
                     'update_interval_hours': 24,
-                    'last_updated': datetime.now()
+                    'last_updated': datetime.now(timezone.utc)
                 }
                 await collection.insert_one(default_config)
                 return {
@@ -97,7 +97,7 @@ class WebSocketService:
                 {
                     '$set': {
                         field: value,
-                        'last_updated': datetime.now()
+                        'last_updated': datetime.now(timezone.utc)
                     }
                 },
                 upsert=True
@@ -130,7 +130,7 @@ class WebSocketService:
                     '$set': {
                         'market_cap_filter': new_market_cap,
                         'filter_condition': condition,
-                        'last_updated': datetime.now()
+                        'last_updated': datetime.now(timezone.utc)
                     }
                 },
                 upsert=True
@@ -176,7 +176,7 @@ class WebSocketService:
                 {
                     '$set': {
                         'update_interval_hours': new_interval,
-                        'last_updated': datetime.now()
+                        'last_updated': datetime.now(timezone.utc)
                     }
                 },
                 upsert=True
@@ -222,7 +222,7 @@ class WebSocketService:
                 {
                     '$set': {
                         'api_error': error_message,
-                        'last_updated': datetime.now()
+                        'last_updated': datetime.now(timezone.utc)
                     }
                 },
                 upsert=True